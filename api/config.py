@@ -103,7 +103,10 @@ class Settings(BaseSettings):
     
     # 文件处理配置
     DISK_SPACE_MULTIPLIER: int = 3  # 磁盘空间倍数（文件大小 * 倍数）
-    FILE_UPLOAD_CHUNK_SIZE: int = 8192  # 文件上传块大小（8KB）
+    FILE_UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # 文件上传块大小（1MB）
+    UPLOAD_WRITER_THREADS: int = min(os.cpu_count() or 1, 8)  # 上传写盘线程数
+    MAX_CONCURRENT_UPLOADS: int = 8  # 同时写盘的上传数
+    UPLOAD_FADVISE_DONTNEED: bool = False  # 流水线读完上传视频后释放其页缓存
     
     # 进程终止配置
     PROCESS_KILL_TIMEOUT: int = 5  # 进程终止等待超时（秒）
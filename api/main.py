@@ -7,6 +7,7 @@ from fastapi.middleware.cors import CORSMiddleware
 import time
 
 from .config import settings, ensure_directories
+from .constants import ErrorCode
 from .utils.logger import logger
 from .utils.dependency_checker import ensure_dependencies
 from .services.worker import get_worker
@@ -107,6 +108,36 @@ app.add_middleware(
 )
 
 
+# 上传请求体上限：文件大小限制 + multipart 表单开销
+_MAX_UPLOAD_BODY = settings.MAX_FILE_SIZE + 1024 * 1024
+_UPLOAD_PATH = "/api/v1/mocap/tasks"
+
+
+# 上传大小中间件：在路由解析 multipart 请求体之前按 Content-Length 拒绝
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    """请求体过大时直接返回 413，不接收、不落盘"""
+    if request.method == "POST" and request.url.path == _UPLOAD_PATH:
+        try:
+            content_length = int(request.headers.get("content-length", "0"))
+        except ValueError:
+            content_length = 0
+        if content_length > _MAX_UPLOAD_BODY:
+            return JSONResponse(
+                status_code=413,
+                content={
+                    "detail": {
+                        "error_code": ErrorCode.FILE_TOO_LARGE,
+                        "error_message": (
+                            f"文件过大: {content_length / (1024 * 1024):.2f}MB，"
+                            f"最大允许: {settings.MAX_FILE_SIZE / (1024 * 1024):.2f}MB"
+                        )
+                    }
+                }
+            )
+    return await call_next(request)
+
+
 # 请求日志中间件
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
@@ -10,7 +10,7 @@ from ..models.task import TaskCreate, TaskResponse, TaskListResponse
 from ..models.error import ErrorResponse
 from ..services.task_manager import get_task_manager
 from ..utils.logger import logger
-from ..utils.file_handler import FileHandler
+from ..utils.file_handler import FileHandler, FileTooLargeError
 from ..utils.video_validator import VideoValidator
 from collections import defaultdict
 from time import time
@@ -88,6 +88,7 @@ async def create_mocap_task(
                 "error_message": f"请求过于频繁，请稍后再试（限制：{settings.RATE_LIMIT_PER_MINUTE}次/分钟，{settings.RATE_LIMIT_PER_HOUR}次/小时）"
             }
         )
+    
     task_manager = get_task_manager()
     
     # 检查队列是否已满
@@ -100,30 +101,25 @@ async def create_mocap_task(
             }
         )
     
-    # 验证文件格式
-    is_valid, error_msg = FileHandler.validate_file(video.filename)
-    if not is_valid:
+    # 上传前检查文件大小、文件名和格式
+    # 大小取自 multipart 解析结果，避免把整个文件读入内存
+    # （大小未知时由 save_upload_file 在流式写入过程中限制）
+    try:
+        FileHandler.preflight(video.filename or "", video.size or 0)
+    except FileTooLargeError as e:
         raise HTTPException(
-            status_code=400,
+            status_code=413,
             detail={
-                "error_code": ErrorCode.INVALID_FILE_FORMAT,
-                "error_message": error_msg
+                "error_code": ErrorCode.FILE_TOO_LARGE,
+                "error_message": str(e)
             }
         )
-    
-    # 读取文件内容以获取大小
-    content = await video.read()
-    file_size = len(content)
-    await video.seek(0)  # 重置文件指针
-    
-    # 验证文件大小
-    is_valid, error_msg = FileHandler.validate_file_size(file_size)
-    if not is_valid:
+    except ValueError as e:
         raise HTTPException(
-            status_code=413,
+            status_code=400,
             detail={
-                "error_code": ErrorCode.FILE_TOO_LARGE,
-                "error_message": error_msg
+                "error_code": ErrorCode.INVALID_FILE_FORMAT,
+                "error_message": str(e)
             }
         )
     
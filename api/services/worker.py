@@ -4,6 +4,7 @@ from typing import Optional
 from ..config import settings
 from ..constants import ProcessStep
 from ..utils.logger import logger
+from ..utils.file_handler import FileHandler
 from ..services.task_manager import get_task_manager
 from ..services.pipeline import FourDHumansPipeline
 
@@ -142,6 +143,10 @@ class Worker:
                 progress_callback
             )
             
+            # 流水线已读完上传视频，此后不再需要其页缓存
+            if settings.UPLOAD_FADVISE_DONTNEED:
+                FileHandler.drop_page_cache(task.video_path)
+            
             if result["success"]:
                 # 任务成功
                 self.task_manager.complete_task(
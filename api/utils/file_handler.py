@@ -1,6 +1,9 @@
 """文件处理工具"""
+import asyncio
 import os
+import re
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional, Tuple
 from fastapi import UploadFile
@@ -8,6 +11,113 @@ from ..config import settings
 from ..utils.logger import logger
 
 
+# 写入过程中磁盘空间采样间隔（块数，必须为 2 的幂）
+_DISK_CHECK_INTERVAL = 8
+_DISK_CHECK_MASK = _DISK_CHECK_INTERVAL - 1
+
+# 预先转换的目录路径，避免热路径上重复构造 Path / 编码
+_UPLOAD_DIR = str(settings.UPLOAD_DIR)
+_UPLOAD_DIR_FSENC = os.fsencode(_UPLOAD_DIR)
+_TEMP_DIR = str(settings.TEMP_DIR)
+_RESULT_DIR_FSENC = os.fsencode(str(settings.RESULT_DIR))
+
+# 允许的扩展名集合（O(1) 查找）及预先拼接的提示文本
+_ALLOWED_EXTS = frozenset(ext.lower() for ext in settings.ALLOWED_VIDEO_FORMATS)
+_ALLOWED_EXTS_TEXT = ", ".join(settings.ALLOWED_VIDEO_FORMATS)
+
+# 文件名格式（只允许字母、数字、点、下划线、连字符）
+_FILENAME_MATCH = re.compile(r'^[a-zA-Z0-9._-]+$').match
+
+# 上传写盘线程池：阻塞的读取/写入不占用事件循环线程
+_UPLOAD_POOL = ThreadPoolExecutor(
+    max_workers=settings.UPLOAD_WRITER_THREADS,
+    thread_name_prefix="upload-io"
+)
+_UPLOAD_SEMAPHORE = asyncio.BoundedSemaphore(settings.MAX_CONCURRENT_UPLOADS)
+
+
+def _file_ext(filename: str) -> str:
+    """返回小写扩展名（含点），没有扩展名时返回空字符串"""
+    dot = filename.rfind(".")
+    return filename[dot:].lower() if dot >= 0 else ""
+
+
+def _dst_path(task_id: str, file_ext: str) -> str:
+    """上传文件的保存路径"""
+    return _UPLOAD_DIR + os.sep + task_id + file_ext
+
+
+def _free_space(dir_fsenc: bytes) -> int:
+    """可用磁盘空间（bytes），等价于 shutil.disk_usage(...).free"""
+    vfs = os.statvfs(dir_fsenc)
+    return vfs.f_bavail * vfs.f_frsize
+
+
+def _unlink_quiet(path: str) -> None:
+    """删除文件，文件不存在时忽略"""
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _copy_upload(src, file_path: str, chunk_size: int) -> int:
+    """
+    把已缓存的上传内容复制到 file_path（在 _UPLOAD_POOL 中整体执行）
+    
+    读写、大小限制和磁盘空间采样都在同一个线程内完成，每个上传只跨越
+    一次事件循环。失败时删除已写入的文件。
+    
+    Returns:
+        写入的字节数
+    """
+    file_size = 0
+    written_chunks = 0
+    fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    completed = False
+    try:
+        while True:
+            chunk = src.read(chunk_size)
+            if not chunk:
+                break
+            
+            # P1修复: 写入过程中定期检查磁盘空间（减少竞态条件）
+            # 每 _DISK_CHECK_INTERVAL 块采样一次，直接调用 statvfs
+            if (written_chunks & _DISK_CHECK_MASK) == 0:
+                if _free_space(_UPLOAD_DIR_FSENC) < chunk_size * _DISK_CHECK_INTERVAL:
+                    raise IOError("磁盘空间不足，写入过程中空间耗尽")
+            written_chunks += 1
+            
+            _write_all(fd, chunk)
+            file_size += len(chunk)
+            
+            # 检查文件大小限制
+            if file_size > settings.MAX_FILE_SIZE:
+                raise IOError(
+                    f"文件过大: {file_size / (1024*1024):.2f}MB "
+                    f"(最大: {settings.MAX_FILE_SIZE / (1024*1024):.2f}MB)"
+                )
+        completed = True
+    finally:
+        os.close(fd)
+        if not completed:
+            # 删除已写入的文件
+            _unlink_quiet(file_path)
+    return file_size
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    """写入全部数据（os.write 可能只写入部分）"""
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+
+class FileTooLargeError(ValueError):
+    """上传文件超过 MAX_FILE_SIZE"""
+
+
 class FileHandler:
     """文件处理器"""
     
@@ -27,29 +137,25 @@ class FileHandler:
             (file_path, file_size)
         """
         # P1修复: 文件名安全性验证
-        import re
         filename = file.filename or ""
-        # 验证文件名格式（只允许字母、数字、点、下划线、连字符）
-        if not re.match(r'^[a-zA-Z0-9._-]+$', filename):
+        if not _FILENAME_MATCH(filename):
             raise ValueError(f"Invalid filename format: {filename}")
         
-        file_ext = Path(filename).suffix.lower()
-        file_path = Path(settings.UPLOAD_DIR) / f"{task_id}{file_ext}"
+        file_ext = _file_ext(filename)
+        file_path = _dst_path(task_id, file_ext)
         
         try:
             # P0修复: 流式读取文件，防止大文件导致内存溢出
             # P1修复: 使用配置中的块大小
-            file_size = 0
             chunk_size = settings.FILE_UPLOAD_CHUNK_SIZE
             
             # 确保目录存在
-            file_path.parent.mkdir(parents=True, exist_ok=True)
+            os.makedirs(_UPLOAD_DIR, exist_ok=True)
             
             # P1修复: 改进磁盘空间检查，减少竞态条件
             # 先检查磁盘空间（基于文件大小限制估算）
-            stat = shutil.disk_usage(settings.UPLOAD_DIR)
             estimated_required_space = settings.MAX_FILE_SIZE * settings.DISK_SPACE_MULTIPLIER
-            available_space = stat.free
+            available_space = _free_space(_UPLOAD_DIR_FSENC)
             
             if available_space < estimated_required_space:
                 required_mb = estimated_required_space / (1024 * 1024)
@@ -59,95 +165,87 @@ class FileHandler:
                     f"可用: {available_mb:.2f}MB"
                 )
             
-            # 流式读取并写入文件
-            with open(file_path, "wb") as f:
-                while True:
-                    chunk = await file.read(chunk_size)
-                    if not chunk:
-                        break
-                    
-                    # P1修复: 写入前再次检查磁盘空间（减少竞态条件）
-                    stat = shutil.disk_usage(settings.UPLOAD_DIR)
-                    if stat.free < chunk_size:
-                        f.close()
-                        file_path.unlink()
-                        raise IOError("磁盘空间不足，写入过程中空间耗尽")
-                    
-                    f.write(chunk)
-                    file_size += len(chunk)
-                    
-                    # 检查文件大小限制
-                    if file_size > settings.MAX_FILE_SIZE:
-                        # 删除已写入的文件
-                        f.close()
-                        file_path.unlink()
-                        raise IOError(
-                            f"文件过大: {file_size / (1024*1024):.2f}MB "
-                            f"(最大: {settings.MAX_FILE_SIZE / (1024*1024):.2f}MB)"
-                        )
+            # 流式读取并写入文件：整个复制在 _UPLOAD_POOL 中一次完成，
+            # 直接读取 multipart 解析后缓存的文件对象
+            loop = asyncio.get_running_loop()
+            async with _UPLOAD_SEMAPHORE:
+                file_size = await loop.run_in_executor(
+                    _UPLOAD_POOL, _copy_upload, file.file, file_path, chunk_size
+                )
             
             # P1修复: 写入后最终检查磁盘空间（基于实际文件大小）
-            stat = shutil.disk_usage(settings.UPLOAD_DIR)
             required_space = file_size * settings.DISK_SPACE_MULTIPLIER
-            available_space = stat.free
+            available_space = _free_space(_UPLOAD_DIR_FSENC)
             
             if available_space < required_space:
                 required_mb = required_space / (1024 * 1024)
                 available_mb = available_space / (1024 * 1024)
                 # 删除已写入的文件
-                if file_path.exists():
-                    file_path.unlink()
+                _unlink_quiet(file_path)
                 raise IOError(
                     f"磁盘空间不足。需要: {required_mb:.2f}MB, "
                     f"可用: {available_mb:.2f}MB"
                 )
             
-            logger.info(f"Saved upload file: {file_path} ({file_size} bytes)")
-            return str(file_path), file_size
+            logger.info("Saved upload file: %s (%d bytes)", file_path, file_size)
+            return file_path, file_size
             
         except Exception as e:
-            logger.error(f"Failed to save upload file: {e}")
+            logger.error("Failed to save upload file: %s", e)
             raise
     
     @staticmethod
-    def validate_file(filename: str) -> Tuple[bool, Optional[str]]:
+    def preflight(filename: str, file_size: int) -> None:
         """
-        验证文件格式
+        上传前一次性检查文件名格式、扩展名和文件大小
+        
+        格式错误优先于大小超限（400 先于 413）。
         
         Args:
             filename: 文件名
+            file_size: 文件大小（bytes）
             
-        Returns:
-            (is_valid, error_message)
+        Raises:
+            FileTooLargeError: 文件过大
+            ValueError: 文件名或格式不合法
         """
-        file_ext = Path(filename).suffix.lower()
+        if not _FILENAME_MATCH(filename):
+            raise ValueError(f"Invalid filename format: {filename}")
         
-        if not file_ext:
-            return False, "文件没有扩展名"
+        dot = filename.rfind(".")
+        if dot < 0:
+            raise ValueError("文件没有扩展名")
         
-        if file_ext not in settings.ALLOWED_VIDEO_FORMATS:
-            allowed = ", ".join(settings.ALLOWED_VIDEO_FORMATS)
-            return False, f"不支持的文件格式: {file_ext}。支持的格式: {allowed}"
+        file_ext = filename[dot:].lower()
+        if file_ext not in _ALLOWED_EXTS:
+            raise ValueError(f"不支持的文件格式: {file_ext}。支持的格式: {_ALLOWED_EXTS_TEXT}")
         
-        return True, None
+        if file_size > settings.MAX_FILE_SIZE:
+            raise FileTooLargeError(
+                f"文件过大: {file_size / (1024 * 1024):.2f}MB，"
+                f"最大允许: {settings.MAX_FILE_SIZE / (1024 * 1024):.2f}MB"
+            )
     
     @staticmethod
-    def validate_file_size(file_size: int) -> Tuple[bool, Optional[str]]:
+    def drop_page_cache(file_path: str) -> None:
         """
-        验证文件大小
+        释放文件占用的页缓存（平台不支持或失败时忽略）
+        
+        只丢弃干净页，不强制刷盘；应在流水线读完文件之后调用。
         
         Args:
-            file_size: 文件大小（bytes）
-            
-        Returns:
-            (is_valid, error_message)
+            file_path: 文件路径
         """
-        if file_size > settings.MAX_FILE_SIZE:
-            max_mb = settings.MAX_FILE_SIZE / (1024 * 1024)
-            current_mb = file_size / (1024 * 1024)
-            return False, f"文件过大: {current_mb:.2f}MB，最大允许: {max_mb:.2f}MB"
-        
-        return True, None
+        try:
+            fd = os.open(file_path, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        except (AttributeError, OSError):
+            pass
+        finally:
+            os.close(fd)
     
     @staticmethod
     def delete_file(file_path: str) -> bool:
@@ -164,11 +262,11 @@ class FileHandler:
             path = Path(file_path)
             if path.exists():
                 path.unlink()
-                logger.info(f"Deleted file: {file_path}")
+                logger.info("Deleted file: %s", file_path)
                 return True
             return False
         except Exception as e:
-            logger.error(f"Failed to delete file {file_path}: {e}")
+            logger.error("Failed to delete file %s: %s", file_path, e)
             return False
     
     @staticmethod
@@ -192,31 +290,33 @@ class FileHandler:
         
                 # 如果是 FBX 文件，同时删除对应的 .fbm 文件夹
                 if file_path.endswith('.fbx'):
-                    fbm_dir = Path(file_path).parent / f"{Path(file_path).stem}.fbm"
-                    if fbm_dir.exists() and fbm_dir.is_dir():
+                    fbm_dir = file_path[:-len('.fbx')] + '.fbm'
+                    if os.path.isdir(fbm_dir):
                         try:
                             shutil.rmtree(fbm_dir)
-                            logger.info(f"Deleted .fbm directory: {fbm_dir}")
+                            logger.info("Deleted .fbm directory: %s", fbm_dir)
                             deleted_count += 1
                         except Exception as e:
-                            logger.error(f"Failed to delete .fbm directory {fbm_dir}: {e}")
+                            logger.error("Failed to delete .fbm directory %s: %s", fbm_dir, e)
         
         # 删除临时文件（通过 task_id 匹配）
-        temp_dir = Path(settings.TEMP_DIR)
-        if temp_dir.exists():
-            for temp_file in temp_dir.glob(f"{task_id}*"):
-                if temp_file.is_file() and FileHandler.delete_file(str(temp_file)):
+        try:
+            entries = [e for e in os.scandir(_TEMP_DIR) if e.name.startswith(task_id)]
+        except FileNotFoundError:
+            entries = []
+        for entry in entries:
+            if entry.is_file() and FileHandler.delete_file(entry.path):
+                deleted_count += 1
+            elif entry.is_dir():
+                # 删除目录（如 .fbm 文件夹）
+                try:
+                    shutil.rmtree(entry.path)
+                    logger.info("Deleted directory: %s", entry.path)
                     deleted_count += 1
-                elif temp_file.is_dir():
-                    # 删除目录（如 .fbm 文件夹）
-                    try:
-                        shutil.rmtree(temp_file)
-                        logger.info(f"Deleted directory: {temp_file}")
-                        deleted_count += 1
-                    except Exception as e:
-                        logger.error(f"Failed to delete directory {temp_file}: {e}")
+                except Exception as e:
+                    logger.error("Failed to delete directory %s: %s", entry.path, e)
         
-        logger.info(f"Deleted {deleted_count} files/directories for task {task_id}")
+        logger.info("Deleted %d files/directories for task %s", deleted_count, task_id)
         return deleted_count
     
     @staticmethod
@@ -236,7 +336,7 @@ class FileHandler:
                 return path.stat().st_size
             return None
         except Exception as e:
-            logger.error(f"Failed to get file size for {file_path}: {e}")
+            logger.error("Failed to get file size for %s: %s", file_path, e)
             return None
     
     @staticmethod
@@ -248,10 +348,12 @@ class FileHandler:
             (total_bytes, used_bytes, usage_percentage)
         """
         try:
-            stat = shutil.disk_usage(settings.RESULT_DIR)
-            usage_percentage = (stat.used / stat.total) * 100
-            return stat.total, stat.used, usage_percentage
+            vfs = os.statvfs(_RESULT_DIR_FSENC)
+            total = vfs.f_blocks * vfs.f_frsize
+            used = (vfs.f_blocks - vfs.f_bfree) * vfs.f_frsize
+            usage_percentage = (used / total) * 100
+            return total, used, usage_percentage
         except Exception as e:
-            logger.error(f"Failed to get disk usage: {e}")
+            logger.error("Failed to get disk usage: %s", e)
             return 0, 0, 0.0
 
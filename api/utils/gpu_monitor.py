@@ -1,14 +1,40 @@
 """GPU 监控工具"""
+import ctypes
 from typing import Optional, Dict
 from ..utils.logger import logger
 
 
+_NVML_SUCCESS = 0
+_NVML_TEMPERATURE_GPU = 0
+
+
+class _NvmlUtilization(ctypes.Structure):
+    """nvmlUtilization_t"""
+    _fields_ = [("gpu", ctypes.c_uint), ("memory", ctypes.c_uint)]
+
+
+class _NvmlMemory(ctypes.Structure):
+    """nvmlMemory_t"""
+    _fields_ = [
+        ("total", ctypes.c_ulonglong),
+        ("free", ctypes.c_ulonglong),
+        ("used", ctypes.c_ulonglong),
+    ]
+
+
 class GPUMonitor:
     """GPU 监控器"""
     
     def __init__(self):
         self.pynvml = None
         self.initialized = False
+        # ctypes 直连 NVML（不可用时为 None，回退到 py3nvml）
+        self._nvml_funcs = None
+        self._handles: Dict[int, ctypes.c_void_p] = {}
+        self._names: Dict[int, str] = {}
+        self._util_buf = _NvmlUtilization()
+        self._mem_buf = _NvmlMemory()
+        self._temp_buf = ctypes.c_uint()
         self._init_pynvml()
     
     def _init_pynvml(self):
@@ -20,8 +46,76 @@ class GPUMonitor:
             self.initialized = True
             logger.info("GPU monitoring initialized")
         except Exception as e:
-            logger.warning(f"Failed to initialize GPU monitoring: {e}")
+            logger.warning("Failed to initialize GPU monitoring: %s", e)
             self.initialized = False
+            return
+        
+        self._init_nvml_ctypes()
+    
+    def _init_nvml_ctypes(self):
+        """解析 NVML C 函数指针（NVML 已由 py3nvml 初始化）"""
+        try:
+            lib = ctypes.CDLL("libnvidia-ml.so.1")
+            
+            get_handle = lib.nvmlDeviceGetHandleByIndex_v2
+            get_handle.argtypes = [ctypes.c_uint, ctypes.POINTER(ctypes.c_void_p)]
+            get_handle.restype = ctypes.c_int
+            
+            get_util = lib.nvmlDeviceGetUtilizationRates
+            get_util.argtypes = [ctypes.c_void_p, ctypes.POINTER(_NvmlUtilization)]
+            get_util.restype = ctypes.c_int
+            
+            get_memory = lib.nvmlDeviceGetMemoryInfo
+            get_memory.argtypes = [ctypes.c_void_p, ctypes.POINTER(_NvmlMemory)]
+            get_memory.restype = ctypes.c_int
+            
+            get_temperature = lib.nvmlDeviceGetTemperature
+            get_temperature.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.POINTER(ctypes.c_uint)]
+            get_temperature.restype = ctypes.c_int
+            
+            self._nvml_funcs = (get_handle, get_util, get_memory, get_temperature)
+        except (OSError, AttributeError) as e:
+            logger.info("NVML ctypes fast path unavailable, using py3nvml: %s", e)
+            self._nvml_funcs = None
+    
+    def _get_stats_ctypes(self, device_id: int) -> Dict:
+        """通过 ctypes 直接调用 NVML 获取统计信息"""
+        get_handle, get_util, get_memory, get_temperature = self._nvml_funcs
+        
+        handle = self._handles.get(device_id)
+        if handle is None:
+            handle = ctypes.c_void_p()
+            ret = get_handle(device_id, ctypes.byref(handle))
+            if ret != _NVML_SUCCESS:
+                raise RuntimeError(f"nvmlDeviceGetHandleByIndex_v2 failed: {ret}")
+            self._handles[device_id] = handle
+        
+        name = self._names.get(device_id)
+        if name is None:
+            name = self.pynvml.nvmlDeviceGetName(self.pynvml.nvmlDeviceGetHandleByIndex(device_id))
+            if isinstance(name, bytes):
+                name = name.decode('utf-8')
+            self._names[device_id] = name
+        
+        util = self._util_buf
+        memory = self._mem_buf
+        temperature = self._temp_buf
+        for ret, func in (
+            (get_util(handle, ctypes.byref(util)), "nvmlDeviceGetUtilizationRates"),
+            (get_memory(handle, ctypes.byref(memory)), "nvmlDeviceGetMemoryInfo"),
+            (get_temperature(handle, _NVML_TEMPERATURE_GPU, ctypes.byref(temperature)), "nvmlDeviceGetTemperature"),
+        ):
+            if ret != _NVML_SUCCESS:
+                raise RuntimeError(f"{func} failed: {ret}")
+        
+        return {
+            "name": name,
+            "utilization": util.gpu,
+            "memory_total": memory.total // (1024 * 1024),  # 转换为 MB
+            "memory_used": memory.used // (1024 * 1024),
+            "memory_free": memory.free // (1024 * 1024),
+            "temperature": temperature.value,
+        }
     
     def get_gpu_stats(self, device_id: int = 0) -> Optional[Dict]:
         """
@@ -44,6 +138,9 @@ class GPUMonitor:
             return None
         
         try:
+            if self._nvml_funcs is not None:
+                return self._get_stats_ctypes(device_id)
+            
             handle = self.pynvml.nvmlDeviceGetHandleByIndex(device_id)
             
             # GPU 名称
@@ -77,7 +174,7 @@ class GPUMonitor:
             }
             
         except Exception as e:
-            logger.error(f"Failed to get GPU stats: {e}")
+            logger.error("Failed to get GPU stats: %s", e)
             return None
     
     def check_gpu_available(self) -> bool:
@@ -91,12 +188,18 @@ class GPUMonitor:
         
         # 检查显存是否充足
         if stats["memory_free"] < settings.GPU_MIN_FREE_MEMORY_MB:
-            logger.warning(f"GPU memory low: {stats['memory_free']}MB free (min: {settings.GPU_MIN_FREE_MEMORY_MB}MB)")
+            logger.warning(
+                "GPU memory low: %sMB free (min: %sMB)",
+                stats["memory_free"], settings.GPU_MIN_FREE_MEMORY_MB
+            )
             return False
         
         # 检查温度是否正常
         if stats["temperature"] > settings.GPU_MAX_TEMPERATURE:
-            logger.warning(f"GPU temperature high: {stats['temperature']}°C (max: {settings.GPU_MAX_TEMPERATURE}°C)")
+            logger.warning(
+                "GPU temperature high: %s°C (max: %s°C)",
+                stats["temperature"], settings.GPU_MAX_TEMPERATURE
+            )
             return False
         
         return True
@@ -105,10 +208,11 @@ class GPUMonitor:
         """关闭 GPU 监控"""
         if self.initialized and self.pynvml:
             try:
+                self._handles.clear()
                 self.pynvml.nvmlShutdown()
                 logger.info("GPU monitoring shutdown")
             except Exception as e:
-                logger.error(f"Failed to shutdown GPU monitoring: {e}")
+                logger.error("Failed to shutdown GPU monitoring: %s", e)
 
 
 # 全局 GPU 监控实例
@@ -76,14 +76,14 @@ class VideoValidator:
                 return False, f"视频帧数过少: {frame_count}帧（至少需要 {settings.MIN_VIDEO_FRAMES} 帧）", video_info
             
             logger.info(
-                f"Video validated: {width}x{height}, {fps:.2f}fps, "
-                f"{frame_count} frames, {duration:.2f}s"
+                "Video validated: %dx%d, %.2ffps, %d frames, %.2fs",
+                width, height, fps, frame_count, duration
             )
             
             return True, None, video_info
             
         except Exception as e:
-            logger.error(f"Failed to validate video: {e}")
+            logger.error("Failed to validate video: %s", e)
             return False, f"视频验证失败: {str(e)}", None
         finally:
             # P0修复: 确保 VideoCapture 资源释放
@@ -122,12 +122,12 @@ class VideoValidator:
             
             # 保存缩略图
             cv2.imwrite(output_path, frame)
-            logger.info(f"Saved thumbnail: {output_path}")
+            logger.info("Saved thumbnail: %s", output_path)
             
             return True
             
         except Exception as e:
-            logger.error(f"Failed to extract thumbnail: {e}")
+            logger.error("Failed to extract thumbnail: %s", e)
             return False
         finally:
             # P0修复: 确保 VideoCapture 资源释放
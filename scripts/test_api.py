@@ -2,27 +2,75 @@
 """API 测试脚本"""
 import argparse
 import requests
+import shutil
 import time
 import sys
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from requests_toolbelt.multipart.encoder import MultipartEncoder
+except ImportError:  # 未安装时回退到 requests 的 files= 上传（整个文件读入内存）
+    MultipartEncoder = None
 
 
 API_BASE = "http://localhost:8000"
 
+# 复用连接（HTTP keep-alive），轮询时不再为每次请求重新建立 TCP/TLS 连接
+# Retry 默认不重试 POST，上传不会被重复提交
+SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    # 重试耗尽后返回最后一次响应，由调用方按状态码处理（不抛 RetryError）
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.2,
+        status_forcelist=[502, 503, 504],
+        raise_on_status=False
+    )
+)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+# requests 默认已带 Accept-Encoding: gzip, deflate
+
+# 仅 JSON 接口带 Accept，FBX 下载不受影响
+_JSON_HEADERS = {'Accept': 'application/json'}
+
+
+def _get_json(url: str):
+    """GET JSON 接口，返回 (status_code, json)；非 200 时 json 为 None"""
+    response = SESSION.get(url, headers=_JSON_HEADERS)
+    
+    if response.status_code != 200:
+        return response.status_code, None
+    return 200, response.json()
+
 
 def create_task(video_path: str, **kwargs):
     """创建任务"""
     print(f"📤 Uploading video: {video_path}")
     
     with open(video_path, 'rb') as f:
-        files = {'video': f}
         data = {k: v for k, v in kwargs.items() if v is not None}
         
-        response = requests.post(
-            f"{API_BASE}/api/v1/mocap/tasks",
-            files=files,
-            data=data
-        )
+        if MultipartEncoder is not None:
+            # 流式编码 multipart 请求体，内存占用与视频大小无关
+            fields = {k: str(v) for k, v in data.items()}
+            fields['video'] = (Path(video_path).name, f, 'application/octet-stream')
+            encoder = MultipartEncoder(fields=fields)
+            response = SESSION.post(
+                f"{API_BASE}/api/v1/mocap/tasks",
+                data=encoder,
+                headers={'Content-Type': encoder.content_type}
+            )
+        else:
+            response = SESSION.post(
+                f"{API_BASE}/api/v1/mocap/tasks",
+                files={'video': f},
+                data=data
+            )
     
     if response.status_code == 200:
         task = response.json()
@@ -37,19 +85,32 @@ def create_task(video_path: str, **kwargs):
 
 def get_task_status(task_id: str):
     """查询任务状态"""
-    response = requests.get(f"{API_BASE}/api/v1/mocap/tasks/{task_id}")
+    status_code, task = _get_json(f"{API_BASE}/api/v1/mocap/tasks/{task_id}")
     
-    if response.status_code == 200:
-        return response.json()
+    if status_code == 200:
+        return task
     else:
-        print(f"❌ Failed to get task status: {response.status_code}")
+        print(f"❌ Failed to get task status: {status_code}")
         return None
 
 
-def wait_for_completion(task_id: str, poll_interval: int = 5):
-    """等待任务完成"""
+def wait_for_completion(
+    task_id: str,
+    poll_interval: float = 0.5,
+    max_interval: float = 10.0,
+    backoff: float = 1.5
+):
+    """
+    等待任务完成
+    
+    轮询间隔从 poll_interval 开始按 backoff 倍数增长（上限 max_interval），
+    进度或步骤变化时重置为 poll_interval。
+    """
     print(f"⏳ Waiting for task {task_id} to complete...")
     
+    interval = poll_interval
+    last_state = None
+    
     while True:
         task = get_task_status(task_id)
         
@@ -60,7 +121,13 @@ def wait_for_completion(task_id: str, poll_interval: int = 5):
         progress = task['progress']
         current_step = task.get('current_step', 'unknown')
         
-        print(f"   Status: {status} | Progress: {progress}% | Step: {current_step}")
+        state = (status, progress, current_step)
+        if state != last_state:
+            print(f"   Status: {status} | Progress: {progress}% | Step: {current_step}")
+            last_state = state
+            interval = poll_interval
+        else:
+            interval = min(interval * backoff, max_interval)
         
         if status == 'completed':
             print(f"✅ Task completed!")
@@ -73,7 +140,7 @@ def wait_for_completion(task_id: str, poll_interval: int = 5):
             print(f"   Error code: {task.get('error_code')}")
             return False
         
-        time.sleep(poll_interval)
+        time.sleep(interval)
 
 
 def download_fbx(task_id: str, output_path: str = None):
@@ -83,15 +150,17 @@ def download_fbx(task_id: str, output_path: str = None):
     
     print(f"📥 Downloading FBX to: {output_path}")
     
-    response = requests.get(
+    response = SESSION.get(
         f"{API_BASE}/api/v1/mocap/tasks/{task_id}/download",
         stream=True
     )
     
     if response.status_code == 200:
+        # 1MB 块直接从底层连接拷贝（按 Content-Encoding 解压）
+        response.raw.decode_content = True
         with open(output_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+            shutil.copyfileobj(response.raw, f, length=1024 * 1024)
+        response.close()
         
         print(f"✅ Downloaded: {output_path}")
         return True
@@ -102,10 +171,9 @@ def download_fbx(task_id: str, output_path: str = None):
 
 def list_tasks():
     """列出所有任务"""
-    response = requests.get(f"{API_BASE}/api/v1/mocap/tasks")
+    status_code, data = _get_json(f"{API_BASE}/api/v1/mocap/tasks")
     
-    if response.status_code == 200:
-        data = response.json()
+    if status_code == 200:
         tasks = data['tasks']
         
         print(f"📋 Total tasks: {data['total']}")
@@ -122,16 +190,15 @@ def list_tasks():
         
         return True
     else:
-        print(f"❌ Failed to list tasks: {response.status_code}")
+        print(f"❌ Failed to list tasks: {status_code}")
         return False
 
 
 def get_health():
     """获取健康状态"""
-    response = requests.get(f"{API_BASE}/api/v1/admin/health")
+    status_code, health = _get_json(f"{API_BASE}/api/v1/admin/health")
     
-    if response.status_code == 200:
-        health = response.json()
+    if status_code == 200:
         
         print("🏥 Health Status")
         print(f"  Status: {health['status']}")
@@ -173,7 +240,7 @@ def get_health():
         
         return True
     else:
-        print(f"❌ Failed to get health: {response.status_code}")
+        print(f"❌ Failed to get health: {status_code}")
         return False
 
 
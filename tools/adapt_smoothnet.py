@@ -23,12 +23,23 @@ Notes:
 from __future__ import annotations
 
 import argparse
+import math
 import os
 import sys
 from typing import Any, Optional, Tuple
 
 import numpy as np
 
+try:
+    from scipy.signal import lfilter, oaconvolve
+except ImportError:  # SciPy is optional; NumPy fallbacks are used without it
+    lfilter = oaconvolve = None
+
+try:
+    from numba import njit, prange
+except ImportError:  # Numba is optional; rot6d_to_rotmat falls back to NumPy
+    njit = None
+
 
 def parse_args():
     ap = argparse.ArgumentParser()
@@ -39,16 +50,39 @@ def parse_args():
     ap.add_argument('--win', type=int, default=9, help='Temporal window for smoothing (odd)')
     ap.add_argument('--ema', type=float, default=0.2, help='EMA factor for camera smoothing (0..1)')
     ap.add_argument('--strength', type=float, default=1.0, help='Blend 0..1 between original (0) and smoothed (1) rotations')
+    ap.add_argument('--kernel', default='box', choices=['box', 'hann', 'tri'],
+                    help='Fallback smoothing kernel (box keeps the original moving average)')
+    ap.add_argument('--compress', default='none', choices=['none', 'zlib'],
+                    help='Output NPZ compression (none: fast uncompressed write for the internal pipeline)')
+    ap.add_argument('--compile', action='store_true',
+                    help='Run SmoothNet under torch.compile (pays off on long sequences)')
     return ap.parse_args()
 
 
-def load_npz(path: str) -> dict:
-    data = np.load(path, allow_pickle=True)
+def load_npz(path: str) -> np.lib.npyio.NpzFile:
+    """Open the NPZ lazily: each array is read only when it is first accessed.
+
+    mmap_mode has no effect on .npz archives, so instead of materializing
+    every member up front the NpzFile mapping itself is returned. The caller
+    owns the file handle: use it as a context manager (``with load_npz(...)``).
+    """
+    data = np.load(path, allow_pickle=False)
     needed = ['R_root', 'R_body', 'frame_idx']
     for k in needed:
         if k not in data:
+            data.close()
             raise SystemExit(f'Missing key in NPZ: {k}')
-    return {k: data[k] for k in data.files}
+    return data
+
+
+def _optional_member(data: np.lib.npyio.NpzFile, key: str) -> Optional[np.ndarray]:
+    """Read an optional member; object members (e.g. a saved None) count as absent."""
+    if key not in data:
+        return None
+    try:
+        return data[key]
+    except ValueError:  # object array, not loadable with allow_pickle=False
+        return None
 
 
 def rotmat_to_6d(R: np.ndarray) -> np.ndarray:
@@ -66,12 +100,37 @@ def _normalize(v: np.ndarray, eps: float = 1e-8) -> np.ndarray:
     return v / np.clip(n, eps, None)
 
 
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _rot6d_to_rotmat_nb(x, out):
+        """Single-pass Gram-Schmidt kernel: x (N,6) -> out (N,3,3) rows."""
+        for i in prange(x.shape[0]):
+            ax, ay, az = x[i, 0], x[i, 1], x[i, 2]
+            bx, by, bz = x[i, 3], x[i, 4], x[i, 5]
+            n = 1.0 / max(math.sqrt(ax*ax + ay*ay + az*az), 1e-8)
+            ax *= n; ay *= n; az *= n
+            d = ax*bx + ay*by + az*bz
+            bx -= d*ax; by -= d*ay; bz -= d*az
+            n = 1.0 / max(math.sqrt(bx*bx + by*by + bz*bz), 1e-8)
+            bx *= n; by *= n; bz *= n
+            out[i, 0, 0] = ax; out[i, 0, 1] = ay; out[i, 0, 2] = az
+            out[i, 1, 0] = bx; out[i, 1, 1] = by; out[i, 1, 2] = bz
+            out[i, 2, 0] = ay*bz - az*by
+            out[i, 2, 1] = az*bx - ax*bz
+            out[i, 2, 2] = ax*by - ay*bx
+
+
 def rot6d_to_rotmat(x: np.ndarray) -> np.ndarray:
     """(T,6) -> (T,3,3) via Gram-Schmidt (rows).
 
     Interprets the 6D as the first two ROWS, then recovers the third row by a
     right-handed cross product. Returns a row-major rotation matrix.
     """
+    if njit is not None:
+        flat = np.ascontiguousarray(x.reshape(-1, 6))
+        out = np.empty((flat.shape[0], 3, 3), dtype=flat.dtype)
+        _rot6d_to_rotmat_nb(flat, out)
+        return out.reshape(x.shape[:-1] + (3, 3))
     r1 = _normalize(x[..., 0:3])
     r2 = x[..., 3:6]
     r2 = _normalize(r2 - (r1 * r2).sum(-1, keepdims=True) * r1)
@@ -82,45 +141,74 @@ def rot6d_to_rotmat(x: np.ndarray) -> np.ndarray:
 def pack_rot_6d(R_root: np.ndarray, R_body: np.ndarray) -> np.ndarray:
     """R_root (T,3,3), R_body (T,23,3,3) -> X (1,T,24*6)."""
     T = R_root.shape[0]
-    root6 = rotmat_to_6d(R_root)                 # (T,6)
-    body6 = rotmat_to_6d(R_body.reshape(T*23,3,3)).reshape(T,23,6)
-    all6 = np.concatenate([root6[:,None,:], body6], axis=1)  # (T,24,6)
-    X = all6.reshape(1, T, 24*6)
-    return X
+    # Fill one (T,24,6) buffer directly from the first two rows (see rotmat_to_6d)
+    all6 = np.empty((T, 24, 6), dtype=np.result_type(R_root, R_body))
+    all6[:, 0, :3] = R_root[:, 0, :]
+    all6[:, 0, 3:] = R_root[:, 1, :]
+    all6[:, 1:, :3] = R_body[:, :, 0, :]
+    all6[:, 1:, 3:] = R_body[:, :, 1, :]
+    return all6.reshape(1, T, 24*6)
 
 
 def unpack_rot_6d(X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
     """X (1,T,24*6) -> R_root(T,3,3), R_body(T,23,3,3)."""
     assert X.ndim == 3 and X.shape[0] == 1, 'Expected (1,T,D)'
     T = X.shape[1]
-    all6 = X.reshape(T, 24, 6)
-    root6 = all6[:, 0, :]
-    body6 = all6[:, 1:, :]
-    R_root = rot6d_to_rotmat(root6)
-    R_body = rot6d_to_rotmat(body6.reshape(T*23, 6)).reshape(T, 23, 3, 3)
-    return R_root, R_body
+    # One Gram-Schmidt pass over all 24 joints; root/body are views of it
+    R_all = rot6d_to_rotmat(X.reshape(T*24, 6)).reshape(T, 24, 3, 3)
+    return R_all[:, 0], R_all[:, 1:]
+
+
+def _smoothing_kernel(kind: str, win: int) -> np.ndarray:
+    """Normalized (win,) window; the zero end taps of hann/tri are trimmed."""
+    if kind == 'hann':
+        k = np.hanning(win + 2)[1:-1]
+    elif kind == 'tri':
+        k = np.bartlett(win + 2)[1:-1]
+    else:
+        k = np.ones(win)
+    return k / k.sum()
 
 
-def smooth_moving_average(X: np.ndarray, win: int) -> np.ndarray:
+def smooth_moving_average(X: np.ndarray, win: int, kernel: str = 'box') -> np.ndarray:
     """Centered moving average with 'same' length output along time (axis=1).
 
     Keeps the temporal length identical to the input by padding and using a
     prefix-sum trick with a leading zero to avoid the classic off-by-one.
+    Non-box kernels are applied with FFT overlap-add convolution over the
+    same edge-padded signal.
     """
     if win < 3 or win % 2 == 0:
         return X
     pad = win // 2
-    Xpad = np.pad(X, ((0, 0), (pad, pad), (0, 0)), mode='edge')
-    cumsum = np.cumsum(Xpad, axis=1)
+    Xpad = np.pad(X.astype(np.float32, copy=False), ((0, 0), (pad, pad), (0, 0)), mode='edge')
+    if kernel != 'box':
+        k = _smoothing_kernel(kernel, win)
+        if oaconvolve is not None:
+            Y = oaconvolve(Xpad, k[np.newaxis, :, np.newaxis], mode='valid', axes=1)
+        else:
+            T = X.shape[1]
+            Y = sum(k[j] * Xpad[:, j:j + T, :] for j in range(win))
+        return Y.astype(np.float32, copy=False)
+    cumsum = np.cumsum(Xpad, axis=1, dtype=np.float32)
     # prepend a zero-frame so windowed differences yield length == T + 2*pad - win + 1 == T
     cumsum = np.concatenate([np.zeros_like(Xpad[:, :1, :]), cumsum], axis=1)
-    Y = (cumsum[:, win:, :] - cumsum[:, :-win, :]) / float(win)
+    Y = (cumsum[:, win:, :] - cumsum[:, :-win, :]) * np.float32(1.0 / win)
     return Y
 
 
 def ema_smooth(C: np.ndarray, alpha: float) -> np.ndarray:
+    """EMA along time (axis=0) with Y[0] = C[0].
+
+    Runs as a first-order IIR filter in SciPy when available; the initial
+    state (1-alpha)*C[0] reproduces the Y[0] = C[0] start of the loop.
+    """
     if not (0.0 < alpha < 1.0):
         return C
+    if lfilter is not None and C.shape[0] > 0:
+        zi = (1.0 - alpha) * C[:1]
+        Y, _ = lfilter([alpha], [1.0, -(1.0 - alpha)], C, axis=0, zi=zi)
+        return Y.astype(C.dtype, copy=False)
     Y = np.empty_like(C)
     Y[0] = C[0]
     for t in range(1, C.shape[0]):
@@ -128,6 +216,10 @@ def ema_smooth(C: np.ndarray, alpha: float) -> np.ndarray:
     return Y
 
 
+# Max sliding windows per SmoothNet forward call (bounds activation memory)
+SMOOTHNET_BATCH = 4096
+
+
 def try_import_smoothnet():
     """Try to import SmoothNet Model and builder from common paths."""
     candidates = [
@@ -145,7 +237,20 @@ def try_import_smoothnet():
     return None
 
 
-def run_smoothnet(X: np.ndarray, ckpt_path: str, win: int) -> Tuple[Optional[np.ndarray], bool, str]:
+def _smoothnet_forward(forward, xw):
+    """Run a (n,win,D) batch, retrying in (n,D,win) layout; returns (n,win,D)."""
+    try:
+        return forward(xw)  # try (n,win,D)
+    except Exception as e1:
+        try:
+            yw = forward(xw.permute(0,2,1).contiguous())  # (n,D,win)
+            return yw.permute(0,2,1)                     # back to (n,win,D)
+        except Exception as e2:
+            raise RuntimeError(f"SmoothNet forward failed: {e1} | alt: {e2}")
+
+
+def run_smoothnet(X: np.ndarray, ckpt_path: str, win: int,
+                  compile_model: bool = False) -> Tuple[Optional[np.ndarray], bool, str]:
     Model = try_import_smoothnet()
     if Model is None or not ckpt_path or not os.path.isfile(ckpt_path):
         return None, False, 'unavailable'
@@ -162,7 +267,13 @@ def run_smoothnet(X: np.ndarray, ckpt_path: str, win: int) -> Tuple[Optional[np.
         model.load_state_dict({k.replace('model.', ''): v for k,v in state.items()}, strict=False)
         model.to(device)
         model.eval()
-        with torch.no_grad():
+        forward = model
+        if compile_model:
+            try:
+                forward = torch.compile(model, mode='reduce-overhead', dynamic=True)
+            except Exception as e:  # torch < 2.0 has no torch.compile
+                print(f"[smooth] torch.compile unavailable, running eager: {e}")
+        with torch.inference_mode():
             # Sliding-window inference: model expects temporal length == window_size
             T, D = int(X.shape[1]), int(X.shape[2])
             if T < win:
@@ -174,28 +285,36 @@ def run_smoothnet(X: np.ndarray, ckpt_path: str, win: int) -> Tuple[Optional[np.
                 Xp = X
                 Tpad = T
 
-            Y_sum = np.zeros((Tpad, D), dtype=np.float32)
-            cnt = np.zeros((Tpad, 1), dtype=np.float32)
             N = Tpad - win + 1
-            x_tensor_full = torch.from_numpy(Xp).float().to(device)  # (1,T,D)
-            e1 = e2 = None
-            for i in range(N):
-                xw = x_tensor_full[:, i:i+win, :]  # (1,win,D)
+            # Stage through pinned host memory so the H2D copy is a direct DMA
+            host = torch.from_numpy(np.ascontiguousarray(Xp, dtype=np.float32))
+            if device.type == 'cuda':
+                host = host.pin_memory()
+            x_tensor_full = host.to(device, non_blocking=True)  # (1,T,D)
+            # All sliding windows as one batch: unfold -> (N,D,win) -> (N,win,D)
+            xb = x_tensor_full[0].unfold(0, win, 1).permute(0, 2, 1)
+            # Frame index covered by each (window, offset) pair, for overlap-add
+            idx = (torch.arange(N, device=device)[:, None]
+                   + torch.arange(win, device=device)[None, :])  # (N,win)
+
+            Y_sum = torch.zeros((Tpad, D), dtype=torch.float32, device=device)
+            # Windows covering frame t: min(t, N-1, win-1, Tpad-1-t) + 1 (closed form)
+            t = torch.arange(Tpad, device=device)
+            cnt = (torch.minimum(t, Tpad - 1 - t).clamp_max(min(N, win) - 1) + 1).to(torch.float32)[:, None]
+            for b0 in range(0, N, SMOOTHNET_BATCH):
+                xw = xb[b0:b0 + SMOOTHNET_BATCH]  # (n,win,D)
                 try:
-                    yw = model(xw)  # try (1,win,D)
-                except Exception as _e1:
-                    e1 = _e1
-                    try:
-                        yw = model(xw.permute(0,2,1))  # (1,D,win)
-                        yw = yw.permute(0,2,1)        # back to (1,win,D)
-                    except Exception as _e2:
-                        e2 = _e2
-                        raise RuntimeError(f"SmoothNet forward failed: {e1} | alt: {e2}")
-                ywn = yw.detach().cpu().numpy()[0]  # (win,D)
-                Y_sum[i:i+win] += ywn
-                cnt[i:i+win] += 1.0
-            Y_full = Y_sum / np.clip(cnt, 1.0, None)
-            Y = Y_full[:T].reshape(1, T, D)
+                    yw = _smoothnet_forward(forward, xw)
+                except Exception as e:
+                    if forward is model:
+                        raise
+                    print(f"[smooth] compiled forward failed, running eager: {e}")
+                    forward = model
+                    yw = _smoothnet_forward(forward, xw)
+                bidx = idx[b0:b0 + SMOOTHNET_BATCH].reshape(-1)
+                Y_sum.index_add_(0, bidx, yw.reshape(-1, D).float())
+            # Normalize on device, single D2H copy of the T valid frames
+            Y = (Y_sum[:T] / cnt[:T]).reshape(1, T, D).cpu().numpy()
         return Y, True, str(device)
     except Exception as e:
         print(f"[smooth] SmoothNet error: {e}")
@@ -206,10 +325,10 @@ def _mean_angle_deg(Ra: np.ndarray, Rb: np.ndarray) -> float:
     """Mean geodesic angle between rotations Ra and Rb in degrees.
     Ra/Rb: (...,3,3)
     """
-    from numpy import swapaxes
-    D = Ra @ swapaxes(Rb, -1, -2)
-    tr = np.clip((D[..., 0, 0] + D[..., 1, 1] + D[..., 2, 2] - 1.0) / 2.0, -1.0, 1.0)
-    ang = np.degrees(np.arccos(tr))
+    # trace(Ra @ Rb^T) == sum(Ra * Rb): no need to form the 3x3 product
+    tr = np.clip((np.einsum('...ij,...ij->...', Ra, Rb) - 1.0) / 2.0, -1.0, 1.0)
+    tr = tr.astype(np.float32, copy=False)
+    ang = np.arccos(tr) * np.float32(180.0 / np.pi)
     return float(np.mean(ang))
 
 
@@ -220,34 +339,48 @@ def _stack24(R_root: np.ndarray, R_body: np.ndarray) -> np.ndarray:
 
 def _velocity_mse(R: np.ndarray) -> float:
     """Mean squared geodesic velocity per joint."""
-    D = R[1:] @ np.transpose(R[:-1], axes=(0, 1, 3, 2))
-    tr = np.clip((D[..., 0, 0] + D[..., 1, 1] + D[..., 2, 2] - 1.0) / 2.0, -1.0, 1.0)
-    ang = np.arccos(tr)  # radians
+    # trace(R[t] @ R[t-1]^T) == sum(R[t] * R[t-1])
+    tr = np.clip((np.einsum('...ij,...ij->...', R[1:], R[:-1]) - 1.0) / 2.0, -1.0, 1.0)
+    ang = np.arccos(tr.astype(np.float32, copy=False))  # radians
     return float(np.mean(ang ** 2))
 
 
+def save_npz(path: str, arrays: dict, compress: str = 'none') -> None:
+    """Write arrays as NPZ; 'zlib' uses np.savez_compressed (DEFLATE)."""
+    if compress == 'zlib':
+        np.savez_compressed(path, **arrays)
+    else:
+        np.savez(path, **arrays)
+
+
 def main():
     args = parse_args()
-    data = load_npz(args.npz)
-
-    R_root = data['R_root'].astype(np.float32)
-    R_body = data['R_body'].astype(np.float32)
-    frame_idx = data['frame_idx'].astype(np.int32)
-    camera = data.get('camera', None)
-    fps = data.get('fps', None)
-    betas = data.get('betas', None)  # Preserve body shape parameters
+    # Additional fields for motion analysis (pass-through, no smoothing)
+    extra_fields = ['3d_joints', 'bbox', 'center', 'scale', 'img_size']
+    # Read every member we need exactly once, then release the zip handle
+    with load_npz(args.npz) as data:
+        R_root = data['R_root'].astype(np.float32)
+        R_body = data['R_body'].astype(np.float32)
+        frame_idx = data['frame_idx'].astype(np.int32)
+        camera = _optional_member(data, 'camera')
+        fps = _optional_member(data, 'fps')
+        betas = _optional_member(data, 'betas')  # Preserve body shape parameters
+        extras = {field: data[field] for field in extra_fields if field in data}
 
     # Pack to 6D
     X = pack_rot_6d(R_root, R_body)  # (1,T,D)
 
-    # Try SmoothNet, else fallback
-    Y, used_model, dev = run_smoothnet(X, args.ckpt, args.win)
-    if Y is None:
-        Y = smooth_moving_average(X, args.win)
-
     # Blend with original to control smoothing strength
     s = float(max(0.0, min(1.0, args.strength)))
-    Z = (1.0 - s) * X + s * Y
+    if s <= 0.0:
+        # Nothing to blend in: skip SmoothNet and the fallback filter entirely
+        Z = X
+    else:
+        # Try SmoothNet, else fallback
+        Y, used_model, dev = run_smoothnet(X, args.ckpt, args.win, args.compile)
+        if Y is None:
+            Y = smooth_moving_average(X, args.win, args.kernel)
+        Z = Y if s >= 1.0 else (1.0 - s) * X + s * Y
 
     # Unpack back to rotation matrices
     R_root_s, R_body_s = unpack_rot_6d(Z)
@@ -266,21 +399,21 @@ def main():
     out_dict = {
         'R_root': R_root_s,
         'R_body': R_body_s,
-        'camera': camera_s if camera_s is not None else camera,
         'frame_idx': frame_idx[:T],
         'fps': fps if fps is not None else np.array([30], dtype=np.int32),
     }
+    # Omit camera when absent: a None would be saved as an object array
+    if camera_s is not None:
+        out_dict['camera'] = camera_s
     # Preserve betas if present
     if betas is not None:
         out_dict['betas'] = betas[:T]
     
-    # Preserve additional fields for motion analysis (pass-through, no smoothing)
-    extra_fields = ['3d_joints', 'bbox', 'center', 'scale', 'img_size']
-    for field in extra_fields:
-        if field in data:
-            out_dict[field] = data[field][:T]
+    # Preserve additional fields for motion analysis; the [:T] slice is a view
+    for field, arr in extras.items():
+        out_dict[field] = arr if arr.shape[0] == T else arr[:T]
     
-    np.savez_compressed(args.out, **out_dict)
+    save_npz(args.out, out_dict, args.compress)
     # Report smoothing statistics (before vs after)
     R0 = _stack24(R_root, R_body)
     Rs = _stack24(R_root_s, R_body_s)
@@ -288,7 +421,10 @@ def main():
     mse0 = _velocity_mse(R0)
     mseS = _velocity_mse(Rs)
     red = 100.0 * (1.0 - (mseS / (mse0 + 1e-8)))
-    used = f"SmoothNet:{used_model}({dev})" if used_model else "fallback:moving_average"
+    if s <= 0.0:
+        used = "none(strength=0)"
+    else:
+        used = f"SmoothNet:{used_model}({dev})" if used_model else f"fallback:moving_average({args.kernel})"
     print(f"[smooth] engine={used} win={args.win} strength={s} ema={args.ema}")
     print(f"[smooth] mean_angle_deg={ang_mean:.4f}  vel_mse_reduction={red:.2f}%")
     print(f"[done] saved: {args.out}")
@@ -15,7 +15,15 @@ def analyze_fbx(fbx_path):
     
     # Import FBX
     try:
-        bpy.ops.import_scene.fbx(filepath=str(fbx_path))
+        # Only armature/action metadata is inspected: skip texture lookup,
+        # custom properties and subdivision setup on character meshes
+        bpy.ops.import_scene.fbx(
+            filepath=str(fbx_path),
+            use_anim=True,
+            use_image_search=False,
+            use_custom_props=False,
+            use_subsurf=False,
+        )
     except Exception as e:
         print(f"Error importing FBX: {e}")
         return
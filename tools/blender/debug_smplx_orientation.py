@@ -27,9 +27,21 @@ def ensure_blender():
         raise SystemExit("Run inside Blender") from exc
 
 
+def print_matrix(m, indent: str = "      ") -> None:
+    """Print a matrix (mathutils.Matrix or ndarray) as a single formatted block."""
+    text = np.array2string(np.asarray(m, dtype=np.float64), precision=4,
+                           suppress_small=True, floatmode='fixed')
+    print(indent + text.replace("\n", "\n" + indent))
+
+
+# NPZ members used by this script
+NPZ_INPUT_KEYS = ('R_root', 'betas')
+
+
 def load_npz(npz_path: str):
-    data = np.load(npz_path)
-    return {k: data[k] for k in data.files}
+    # Read only the members actually used, then close the archive
+    with np.load(npz_path, allow_pickle=False) as npz:
+        return {k: npz[k] for k in NPZ_INPUT_KEYS if k in npz.files}
 
 
 def main_blender(args):
@@ -46,10 +58,7 @@ def main_blender(args):
     print("="*60)
     
     # Clean scene
-    for obj in list(bpy.data.objects):
-        obj.select_set(True)
-    if bpy.data.objects:
-        bpy.ops.object.delete()
+    bpy.data.batch_remove(list(bpy.data.objects))
     
     # Create SMPL-X character
     print("\n1. Creating SMPL-X character...")
@@ -69,13 +78,13 @@ def main_blender(args):
     print(f"   ✓ Armature: {arm.name}")
     
     # Check armature world matrix
+    mw = arm.matrix_world.copy()
     print(f"\n2. Armature World Matrix:")
     print(f"   Location: {arm.location}")
     print(f"   Rotation (Euler): {arm.rotation_euler}")
     print(f"   Scale: {arm.scale}")
     print(f"   Matrix World:")
-    for row in arm.matrix_world:
-        print(f"      {[f'{x:7.4f}' for x in row]}")
+    print_matrix(mw)
     
     # Check pelvis bone orientation in rest pose
     if 'pelvis' in arm.data.bones:
@@ -86,26 +95,21 @@ def main_blender(args):
         print(f"   Vector: {pelvis_bone.vector}")
         print(f"   Length: {pelvis_bone.length:.4f}")
         print(f"   Matrix (local):")
-        for row in pelvis_bone.matrix_local:
-            print(f"      {[f'{x:7.4f}' for x in row]}")
+        print_matrix(pelvis_bone.matrix_local)
     
     # Apply first frame rotation to see direction
     print(f"\n4. Applying first frame SMPL rotation...")
     Mr = R_root[0]
     print(f"   SMPL R_root[0]:")
-    for row in Mr:
-        print(f"      {[f'{x:7.4f}' for x in row]}")
+    print_matrix(Mr)
     
     # Convert to quaternion and apply
-    m = Matrix(((float(Mr[0,0]), float(Mr[0,1]), float(Mr[0,2])),
-                (float(Mr[1,0]), float(Mr[1,1]), float(Mr[1,2])),
-                (float(Mr[2,0]), float(Mr[2,1]), float(Mr[2,2]))))
+    m = Matrix(np.asarray(Mr, dtype=np.float64).tolist())
     q = m.to_quaternion()
     
     print(f"   Quaternion: {q}")
     
     # Apply to pose bone
-    bpy.context.scene.frame_set(1)
     if 'pelvis' in arm.pose.bones:
         pb = arm.pose.bones['pelvis']
         pb.rotation_mode = 'QUATERNION'
@@ -114,12 +118,11 @@ def main_blender(args):
         
         print(f"\n5. Pelvis Pose Bone (after rotation):")
         print(f"   Rotation (Quat): {pb.rotation_quaternion}")
+        pm = pb.matrix.copy()
         print(f"   Matrix (pose space):")
-        for row in pb.matrix:
-            print(f"      {[f'{x:7.4f}' for x in row]}")
+        print_matrix(pm)
         print(f"   Matrix (world space):")
-        for row in pb.matrix @ arm.matrix_world:
-            print(f"      {[f'{x:7.4f}' for x in row]}")
+        print_matrix(pm @ mw)
     
     # Check head bone to see overall orientation
     if 'head' in arm.data.bones:
@@ -127,8 +130,8 @@ def main_blender(args):
         print(f"\n6. Head Bone (to check up direction):")
         print(f"   Head: {head_bone.head}")
         print(f"   Tail: {head_bone.tail}")
-        print(f"   World Head: {arm.matrix_world @ head_bone.head_local}")
-        print(f"   World Tail: {arm.matrix_world @ head_bone.tail_local}")
+        print(f"   World Head: {mw @ head_bone.head_local}")
+        print(f"   World Tail: {mw @ head_bone.tail_local}")
     
     # Check coordinate system axes
     print(f"\n7. Blender Coordinate System Check:")
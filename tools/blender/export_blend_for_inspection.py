@@ -29,10 +29,7 @@ def main():
     R_root = data['R_root']
     
     # Clean scene
-    for obj in list(bpy.data.objects):
-        obj.select_set(True)
-    if bpy.data.objects:
-        bpy.ops.object.delete()
+    bpy.data.batch_remove(list(bpy.data.objects))
     
     # Create SMPL-X
     bpy.context.window_manager.smplx_tool.smplx_gender = 'female'
@@ -48,12 +45,9 @@ def main():
     # Apply NPZ rotation DIRECTLY (no conversion)
     Mr = R_root[0]
     
-    m = Matrix(((float(Mr[0,0]), float(Mr[0,1]), float(Mr[0,2])),
-                (float(Mr[1,0]), float(Mr[1,1]), float(Mr[1,2])),
-                (float(Mr[2,0]), float(Mr[2,1]), float(Mr[2,2]))))
+    m = Matrix(np.asarray(Mr, dtype=np.float64).tolist())
     q = m.to_quaternion()
     
-    bpy.context.scene.frame_set(1)
     pb = arm.pose.bones['pelvis']
     pb.rotation_mode = 'QUATERNION'
     pb.rotation_quaternion = q
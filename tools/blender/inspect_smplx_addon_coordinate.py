@@ -4,9 +4,11 @@ Inspect the SMPL-X Blender Addon's coordinate system.
 Check what coordinate system the addon uses for its bones.
 """
 
+import io
 import sys
 import numpy as np
 import math
+from contextlib import redirect_stdout
 
 def main():
     import bpy
@@ -17,10 +19,7 @@ def main():
     print("="*70)
     
     # Clean scene
-    for obj in list(bpy.data.objects):
-        obj.select_set(True)
-    if bpy.data.objects:
-        bpy.ops.object.delete()
+    bpy.data.batch_remove(list(bpy.data.objects))
     
     # Create SMPL-X character
     print("\n[1] Creating SMPL-X character (rest pose)...")
@@ -40,19 +39,25 @@ def main():
     print(f"  Object rotation: {arm.rotation_euler}")
     print(f"  Object location: {arm.location}")
     
+    # Resolve matrices/bones once; reused by every test below
+    mw = arm.matrix_world.copy()
+    bones = arm.data.bones
+    head_pb = arm.pose.bones.get('head')
+    head_rest = mw @ bones['head'].head_local if head_pb is not None else None
+    
     # Check armature coordinate system
     print(f"\n[2] Armature world matrix:")
-    for i, row in enumerate(arm.matrix_world):
+    for i, row in enumerate(mw):
         print(f"  Row {i}: [{', '.join(f'{x:7.4f}' for x in row)}]")
     
     # Check bone orientations in rest pose
     print(f"\n[3] Key bone positions in rest pose (world space):")
     bones_to_check = ['pelvis', 'spine', 'head', 'left_shoulder', 'right_shoulder']
     for bone_name in bones_to_check:
-        if bone_name in arm.data.bones:
-            bone = arm.data.bones[bone_name]
-            head_world = arm.matrix_world @ bone.head_local
-            tail_world = arm.matrix_world @ bone.tail_local
+        bone = bones.get(bone_name)
+        if bone is not None:
+            head_world = mw @ bone.head_local
+            tail_world = mw @ bone.tail_local
             direction = tail_world - head_world
             print(f"  {bone_name}:")
             print(f"    Head: {head_world}")
@@ -63,15 +68,13 @@ def main():
     print(f"\n[4] Test: Apply 90° Y-axis rotation to pelvis")
     print(f"  Expected: Character turns left (head moves in -X direction)")
     
-    bpy.context.scene.frame_set(1)
     pb = arm.pose.bones['pelvis']
     pb.rotation_mode = 'XYZ'
     pb.rotation_euler = (0, math.radians(90), 0)
     bpy.context.view_layer.update()
     
-    if 'head' in arm.data.bones:
-        head_rest = arm.matrix_world @ arm.data.bones['head'].head_local
-        head_pose = arm.matrix_world @ arm.pose.bones['head'].matrix @ Vector((0,0,0))
+    if head_pb is not None:
+        head_pose = mw @ head_pb.matrix.translation
         print(f"  Head rest: {head_rest}")
         print(f"  Head pose: {head_pose}")
         print(f"  Delta X: {head_pose.x - head_rest.x:.4f}")
@@ -82,13 +85,11 @@ def main():
     print(f"\n[5] Test: Apply 90° X-axis rotation to pelvis")
     print(f"  Expected: Character leans backward (head moves in +Y direction in Blender)")
     
-    bpy.context.scene.frame_set(2)
     pb.rotation_euler = (math.radians(90), 0, 0)
     bpy.context.view_layer.update()
     
-    if 'head' in arm.data.bones:
-        head_rest = arm.matrix_world @ arm.data.bones['head'].head_local
-        head_pose = arm.matrix_world @ arm.pose.bones['head'].matrix @ Vector((0,0,0))
+    if head_pb is not None:
+        head_pose = mw @ head_pb.matrix.translation
         print(f"  Head rest: {head_rest}")
         print(f"  Head pose: {head_pose}")
         print(f"  Delta X: {head_pose.x - head_rest.x:.4f}")
@@ -108,5 +109,12 @@ def main():
 
 
 if __name__ == '__main__':
-    main()
+    # Buffer the report and write it in one go (Blender's piped stdout is unbuffered)
+    buf = io.StringIO()
+    try:
+        with redirect_stdout(buf):
+            main()
+    finally:
+        sys.stdout.write(buf.getvalue())
+        sys.stdout.flush()
 
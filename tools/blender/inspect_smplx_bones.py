@@ -16,8 +16,7 @@ if arm is None:
     print('[ERR] no armature found')
 else:
     print('[ARM]', arm.name)
-    for b in arm.data.bones:
-        print('[BONE]', b.name)
+    print('\n'.join('[BONE] ' + b.name for b in arm.data.bones))
 
 print('[done]')
 
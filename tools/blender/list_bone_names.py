@@ -33,8 +33,8 @@ def list_bones(fbx_path):
     
     print("Bone names:")
     print("-" * 70)
-    for i, bone in enumerate(arm.data.bones, 1):
-        print(f"{i:3d}. {bone.name}")
+    # One write for the whole list instead of a print per bone
+    print("\n".join(f"{i:3d}. {bone.name}" for i, bone in enumerate(arm.data.bones, 1)))
     
     print("\n" + "="*70)
 
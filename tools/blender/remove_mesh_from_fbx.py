@@ -7,6 +7,7 @@ Usage:
 """
 
 import bpy
+import os
 import sys
 import argparse
 from pathlib import Path
@@ -23,17 +24,29 @@ def parse_args():
     parser = argparse.ArgumentParser(description='Remove mesh from FBX, keep skeleton and animation')
     parser.add_argument('--input', required=True, help='Input FBX file path')
     parser.add_argument('--output', required=True, help='Output FBX file path')
+    parser.add_argument('--bake-step', type=float, default=1.0,
+                        help='Frames between baked keys (default: 1.0, every frame)')
+    parser.add_argument('--bake-simplify', type=float, default=0.0,
+                        help='FBX curve simplification factor (default: 0.0, none; '
+                             '1.0 greatly reduces keys and export time on long clips)')
+    parser.add_argument('--verbose', action='store_true',
+                        help='List every object found, deleted and selected')
     
     return parser.parse_args(argv)
 
 
 def main():
     args = parse_args()
+    # Per-object lines only with --verbose; step banners and summary always print
+    vprint = print if args.verbose else (lambda *a, **k: None)
     
     input_path = Path(args.input)
     output_path = Path(args.output)
     
-    if not input_path.exists():
+    # Single stat: existence check and the size report at the end
+    try:
+        input_size = os.stat(input_path).st_size / (1024 * 1024)  # MB
+    except FileNotFoundError:
         raise FileNotFoundError(f"Input file not found: {input_path}")
     
     print("=" * 70)
@@ -43,10 +56,12 @@ def main():
     print(f"Output: {output_path}")
     print()
     
+    # Headless run: no undo steps for the import/export operators
+    bpy.context.preferences.edit.use_global_undo = False
+    
     # Clear scene
     print("[1/4] Clearing scene...")
-    bpy.ops.object.select_all(action='SELECT')
-    bpy.ops.object.delete()
+    bpy.data.batch_remove(list(bpy.data.objects))
     
     # Import FBX
     print(f"[2/4] Importing FBX: {input_path}")
@@ -59,7 +74,7 @@ def main():
     other_objects = []
     
     for obj in bpy.data.objects:
-        print(f"  Found: {obj.name} (type: {obj.type})")
+        vprint(f"  Found: {obj.name} (type: {obj.type})")
         if obj.type == 'MESH':
             mesh_objects.append(obj)
         elif obj.type == 'ARMATURE':
@@ -78,11 +93,9 @@ def main():
     # Delete mesh objects
     if mesh_objects:
         print(f"\n  Removing {len(mesh_objects)} mesh object(s)...")
-        bpy.ops.object.select_all(action='DESELECT')
         for mesh_obj in mesh_objects:
-            print(f"    Deleting: {mesh_obj.name}")
-            mesh_obj.select_set(True)
-        bpy.ops.object.delete()
+            vprint(f"    Deleting: {mesh_obj.name}")
+        bpy.data.batch_remove(mesh_objects)
     else:
         print("\n  No mesh objects to remove")
     
@@ -91,7 +104,7 @@ def main():
     bpy.ops.object.select_all(action='DESELECT')
     for arm_obj in armature_objects:
         arm_obj.select_set(True)
-        print(f"  Selected: {arm_obj.name}")
+        vprint(f"  Selected: {arm_obj.name}")
     
     # Set first armature as active
     bpy.context.view_layer.objects.active = armature_objects[0]
@@ -123,14 +136,14 @@ def main():
         bake_anim=True,  # Bake animation
         bake_anim_use_nla_strips=False,
         bake_anim_use_all_actions=False,
-        bake_anim_simplify_factor=0  # No simplification
+        bake_anim_step=args.bake_step,
+        bake_anim_simplify_factor=args.bake_simplify  # 0 = no simplification
     )
     
     print(f"\n✓ Export complete: {output_path}")
     
     # Show file sizes
-    input_size = input_path.stat().st_size / (1024 * 1024)  # MB
-    output_size = output_path.stat().st_size / (1024 * 1024)  # MB
+    output_size = os.stat(output_path).st_size / (1024 * 1024)  # MB
     print(f"\nFile size comparison:")
     print(f"  Input:  {input_size:.2f} MB")
     print(f"  Output: {output_size:.2f} MB")
@@ -35,17 +35,32 @@ The script will:
 
 import sys
 import os
+import math
 import argparse
 import numpy as np
 from pathlib import Path
 
+try:
+    from numba import njit, prange
+except ImportError:  # Numba is optional (Blender's Python rarely ships it); NumPy path is used
+    njit = None
+
+try:
+    from scipy.spatial.transform import Rotation
+except ImportError:  # SciPy is optional; used when Numba is missing
+    Rotation = None
+
 # Add tools directory to path for motion_analyzer
 sys.path.insert(0, str(Path(__file__).parent.parent))
 try:
     from motion_analyzer import MotionAnalyzer
 except ImportError:
-    MotionAnalyzer = None
-    print("[warning] motion_analyzer not found, motion analysis disabled")
+    MotionAnalyzer = None  # reported when convert_to_amass_format skips the analysis
+
+
+# NPZ members used by the conversion and the motion analyzer
+NPZ_INPUT_KEYS = ('R_root', 'R_body', 'camera', 'betas',
+                  '3d_joints', 'bbox', 'center', 'scale', 'img_size')
 
 
 def parse_args(argv):
@@ -57,6 +72,8 @@ def parse_args(argv):
                     help="Body gender (default: female)")
     ap.add_argument("--target-format", default="UNITY", choices=["UNITY", "UNREAL"],
                     help="Target game engine format (default: UNITY)")
+    ap.add_argument("--quiet", action="store_true",
+                    help="Print a one-line motion analysis summary instead of the full report")
     return ap.parse_args(argv)
 
 
@@ -68,33 +85,96 @@ def ensure_blender():
         raise SystemExit("Run inside Blender: blender -b -P ... -- <args>") from exc
 
 
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _rotmat_to_rodrigues_nb(R, out):
+        """Fused Shepperd + axis-angle kernel: R (M,3,3) -> out (M,3)."""
+        for i in prange(R.shape[0]):
+            m00 = R[i, 0, 0]; m01 = R[i, 0, 1]; m02 = R[i, 0, 2]
+            m10 = R[i, 1, 0]; m11 = R[i, 1, 1]; m12 = R[i, 1, 2]
+            m20 = R[i, 2, 0]; m21 = R[i, 2, 1]; m22 = R[i, 2, 2]
+            cw = 1.0 + m00 + m11 + m22
+            cx = 1.0 + m00 - m11 - m22
+            cy = 1.0 - m00 + m11 - m22
+            cz = 1.0 - m00 - m11 + m22
+            if cw >= cx and cw >= cy and cw >= cz:
+                s = 2.0 * math.sqrt(max(cw, 1e-12))
+                w = 0.25 * s; x = (m21 - m12) / s; y = (m02 - m20) / s; z = (m10 - m01) / s
+            elif cx >= cy and cx >= cz:
+                s = 2.0 * math.sqrt(max(cx, 1e-12))
+                w = (m21 - m12) / s; x = 0.25 * s; y = (m01 + m10) / s; z = (m02 + m20) / s
+            elif cy >= cz:
+                s = 2.0 * math.sqrt(max(cy, 1e-12))
+                w = (m02 - m20) / s; x = (m01 + m10) / s; y = 0.25 * s; z = (m12 + m21) / s
+            else:
+                s = 2.0 * math.sqrt(max(cz, 1e-12))
+                w = (m10 - m01) / s; x = (m02 + m20) / s; y = (m12 + m21) / s; z = 0.25 * s
+            if w < 0.0:
+                w = -w; x = -x; y = -y; z = -z
+            n = math.sqrt(x*x + y*y + z*z)
+            theta = 2.0 * math.atan2(n, w)
+            k = theta / max(n, 1e-12)
+            out[i, 0] = x * k; out[i, 1] = y * k; out[i, 2] = z * k
+
+
 def rotmat_to_rodrigues(R: np.ndarray) -> np.ndarray:
     """
-    Convert 3x3 rotation matrix to Rodrigues vector (axis-angle).
+    Convert rotation matrices (..., 3, 3) to Rodrigues vectors (..., 3) (axis-angle).
     
-    Based on cv2.Rodrigues formula without scipy dependency.
+    Vectorized over all leading axes. Goes through a quaternion using Shepperd's
+    method (branch on the largest of 4w², 4x², 4y², 4z²), which stays stable near
+    180° where the arccos/sin(theta) formula divides by ~0. Uses the Numba kernel
+    or scipy's Rotation when available, otherwise plain NumPy.
     """
-    theta = np.arccos(np.clip((np.trace(R) - 1) / 2, -1, 1))
-    
-    if theta < 1e-6:
-        # Small angle, return zero vector
-        return np.zeros(3, dtype=np.float64)
-    
-    # Compute rotation axis
-    r = np.array([
-        R[2, 1] - R[1, 2],
-        R[0, 2] - R[2, 0],
-        R[1, 0] - R[0, 1]
-    ], dtype=np.float64)
-    
-    axis = r / (2 * np.sin(theta))
-    
-    # Rodrigues vector = axis * angle
-    rodrigues = axis * theta
-    return rodrigues.astype(np.float64)
+    R = np.asarray(R, dtype=np.float64)
+    if njit is not None:
+        flat = np.ascontiguousarray(R.reshape(-1, 3, 3))
+        out = np.empty((flat.shape[0], 3), dtype=np.float64)
+        _rotmat_to_rodrigues_nb(flat, out)
+        return out.reshape(R.shape[:-2] + (3,))
+    if Rotation is not None:
+        # C implementation, also quaternion-based (stable near 180°)
+        rotvec = Rotation.from_matrix(R.reshape(-1, 3, 3)).as_rotvec()
+        return rotvec.reshape(R.shape[:-2] + (3,))
+    m00, m11, m22 = R[..., 0, 0], R[..., 1, 1], R[..., 2, 2]
+    
+    # 4*q^2 for each component (w, x, y, z); pick the largest per matrix
+    cand = np.stack([1.0 + m00 + m11 + m22,
+                     1.0 + m00 - m11 - m22,
+                     1.0 - m00 + m11 - m22,
+                     1.0 - m00 - m11 + m22], axis=-1)
+    k = np.argmax(cand, axis=-1)
+    s = 2.0 * np.sqrt(np.maximum(np.take_along_axis(cand, k[..., None], axis=-1)[..., 0], 1e-12))  # 4*|q_k|
+    
+    d21 = R[..., 2, 1] - R[..., 1, 2]
+    d02 = R[..., 0, 2] - R[..., 2, 0]
+    d10 = R[..., 1, 0] - R[..., 0, 1]
+    a01 = R[..., 0, 1] + R[..., 1, 0]
+    a02 = R[..., 0, 2] + R[..., 2, 0]
+    a12 = R[..., 1, 2] + R[..., 2, 1]
+    q4 = 0.25 * s
+    branch = [k == 0, k == 1, k == 2, k == 3]
+    w = np.select(branch, [q4, d21 / s, d02 / s, d10 / s])
+    v = np.stack([np.select(branch, [d21 / s, q4, a01 / s, a02 / s]),
+                  np.select(branch, [d02 / s, a01 / s, q4, a12 / s]),
+                  np.select(branch, [d10 / s, a02 / s, a12 / s, q4])], axis=-1)
+    
+    # Canonical hemisphere (w >= 0) so that theta is in [0, pi]
+    sign = np.where(w < 0.0, -1.0, 1.0)
+    w = w * sign
+    v = v * sign[..., None]
+    
+    n = np.linalg.norm(v, axis=-1)
+    theta = 2.0 * np.arctan2(n, w)
+    
+    # Rodrigues vector = axis * angle. theta / n -> 2 / w as n -> 0, so no
+    # small-angle branch is needed; n == 0 gives theta == 0 and a zero vector
+    scale = theta / np.maximum(n, 1e-12)
+    return v * scale[..., None]
 
 
-def convert_to_amass_format(npz_path: str, output_path: str, gender: str, fps: int):
+def convert_to_amass_format(npz_path: str, output_path: str, gender: str, fps: int,
+                            verbose: bool = True):
     """
     Convert our NPZ format (rotation matrices) to AMASS format (Rodrigues vectors).
     
@@ -113,80 +193,95 @@ def convert_to_amass_format(npz_path: str, output_path: str, gender: str, fps: i
     - betas: (T, 10) or (10,) - Optional shape parameters
     """
     print(f"[convert] Loading NPZ: {npz_path}")
-    data = np.load(npz_path)
+    # Read each consumed member exactly once: NpzFile re-reads (and inflates) on
+    # every data[key] access, and mmap_mode is ignored for .npz archives.
+    # Members nobody reads here (frame_idx, fps, ...) are never loaded.
+    with np.load(npz_path, allow_pickle=False) as npz:
+        data = {k: npz[k] for k in NPZ_INPUT_KEYS if k in npz.files}
     
     R_root = data['R_root']  # (T, 3, 3)
     R_body = data['R_body']  # (T, 23, 3, 3)
-    frame_idx = data['frame_idx']
     
     T = R_root.shape[0]
     print(f"[convert] Frames: {T}, FPS: {fps}, Gender: {gender}")
+    if T == 0:
+        # Fail before motion analysis and the Blender import/export round-trip
+        raise RuntimeError(f"NPZ has no frames: {npz_path}")
     
     # Get camera translation (default to zeros if not available)
     if 'camera' in data and data['camera'].size > 0:
-        trans_raw = data['camera'].copy()  # (T, 3)
+        trans_raw = data['camera']  # (T, 3); read-only below, no copy needed
     else:
-        trans_raw = np.zeros((T, 3), dtype=np.float64)
+        trans_raw = np.zeros((T, 3), dtype=np.float32)
     
     # === MOTION ANALYSIS ===
     if MotionAnalyzer is not None and trans_raw.size > 0:
-        print("\n" + "=" * 70)
-        print("MOTION ANALYSIS")
-        print("=" * 70)
-        
-        analyzer = MotionAnalyzer(dict(data))
+        analyzer = MotionAnalyzer(data)
         result = analyzer.analyze()
         
-        # Print detailed analysis
-        print(f"\n[Analysis 1] Heuristic:")
-        h = result['details']['heuristic']
-        print(f"  Z range: {h['reasoning']['z_range']:.2f}m")
-        print(f"  XY max: {h['reasoning']['xy_max']:.2f}m")
-        print(f"  Z is camera: {h['reasoning']['z_is_camera']}")
-        print(f"  Confidence: {h['confidence']:.2f}")
-        
-        print(f"\n[Analysis 2] Pelvis:")
-        p = result['details']['pelvis']
-        if p['reasoning'].get('available'):
-            print(f"  Pelvis smoother: {p['reasoning']['pelvis_smoother']}")
-            print(f"  Pelvis Z range: {p['reasoning']['pelvis_z_range']:.2f}m")
-            print(f"  XY diff: {p['reasoning']['xy_diff']:.3f}m")
-            print(f"  Confidence: {p['confidence']:.2f}")
-        else:
-            print(f"  {p['reasoning']['message']}")
-            print(f"  Confidence: {p['confidence']:.2f}")
-        
-        print(f"\n[Analysis 3] Perspective:")
-        t = result['details']['perspective']
-        if t['reasoning'].get('available'):
-            print(f"  Scale matches: {t['reasoning']['scale_matches']}")
-            print(f"  Bbox centered: {t['reasoning']['bbox_centered']}")
-            print(f"  Motion type: {t['reasoning']['motion_type']}")
-            print(f"  Confidence: {t['confidence']:.2f}")
-        else:
-            print(f"  {t['reasoning']['message']}")
-            print(f"  Confidence: {t['confidence']:.2f}")
-        
-        print(f"\n[Decision]")
-        print(f"  Primary method: {result['method']}")
-        print(f"  Final confidence: {result['confidence']:.2f}")
-        print(f"  Z decision: {result['z_decision']} (votes: {sum(result['z_votes'])}/3)")
-        print(f"  Weights: H={result['weights']['heuristic']:.2f}, "
-              f"P={result['weights']['pelvis']:.2f}, "
-              f"T={result['weights']['perspective']:.2f}")
-        
         # Use corrected translation
         trans = result['trans_corrected']
         
-        print(f"\n[Final Translation]")
-        print(f"  X: [{trans[:, 0].min():.3f}, {trans[:, 0].max():.3f}]")
-        print(f"  Y: [{trans[:, 1].min():.3f}, {trans[:, 1].max():.3f}]")
-        print(f"  Z: [{trans[:, 2].min():.3f}, {trans[:, 2].max():.3f}]")
-        print("=" * 70 + "\n")
+        if verbose:
+            # Build the detailed analysis report and write it out in one go
+            h = result['details']['heuristic']
+            p = result['details']['pelvis']
+            t = result['details']['perspective']
+            report = [
+                "\n" + "=" * 70,
+                "MOTION ANALYSIS",
+                "=" * 70,
+                "\n[Analysis 1] Heuristic:",
+                f"  Z range: {h['reasoning']['z_range']:.2f}m",
+                f"  XY max: {h['reasoning']['xy_max']:.2f}m",
+                f"  Z is camera: {h['reasoning']['z_is_camera']}",
+                f"  Confidence: {h['confidence']:.2f}",
+                "\n[Analysis 2] Pelvis:",
+            ]
+            if p['reasoning'].get('available'):
+                report += [
+                    f"  Pelvis smoother: {p['reasoning']['pelvis_smoother']}",
+                    f"  Pelvis Z range: {p['reasoning']['pelvis_z_range']:.2f}m",
+                    f"  XY diff: {p['reasoning']['xy_diff']:.3f}m",
+                ]
+            else:
+                report.append(f"  {p['reasoning']['message']}")
+            report += [
+                f"  Confidence: {p['confidence']:.2f}",
+                "\n[Analysis 3] Perspective:",
+            ]
+            if t['reasoning'].get('available'):
+                report += [
+                    f"  Scale matches: {t['reasoning']['scale_matches']}",
+                    f"  Bbox centered: {t['reasoning']['bbox_centered']}",
+                    f"  Motion type: {t['reasoning']['motion_type']}",
+                ]
+            else:
+                report.append(f"  {t['reasoning']['message']}")
+            report += [
+                f"  Confidence: {t['confidence']:.2f}",
+                "\n[Decision]",
+                f"  Primary method: {result['method']}",
+                f"  Final confidence: {result['confidence']:.2f}",
+                f"  Z decision: {result['z_decision']} (votes: {sum(result['z_votes'])}/3)",
+                f"  Weights: H={result['weights']['heuristic']:.2f}, "
+                f"P={result['weights']['pelvis']:.2f}, "
+                f"T={result['weights']['perspective']:.2f}",
+                "\n[Final Translation]",
+                f"  X: [{trans[:, 0].min():.3f}, {trans[:, 0].max():.3f}]",
+                f"  Y: [{trans[:, 1].min():.3f}, {trans[:, 1].max():.3f}]",
+                f"  Z: [{trans[:, 2].min():.3f}, {trans[:, 2].max():.3f}]",
+                "=" * 70 + "\n",
+            ]
+            print("\n".join(report))
+        else:
+            print(f"[convert] Motion analysis: {result['method']} "
+                  f"(confidence {result['confidence']:.2f})")
     else:
         # No motion analysis, use raw translation
         trans = trans_raw
-        print("[convert] Motion analysis skipped (no analyzer or no camera data)")
+        reason = "motion_analyzer not found" if MotionAnalyzer is None else "no camera data"
+        print(f"[convert] Motion analysis skipped ({reason})")
     
     # Get betas (default to tall and thin if not available)
     if 'betas' in data and data['betas'].size > 0:
@@ -197,7 +292,7 @@ def convert_to_amass_format(npz_path: str, output_path: str, gender: str, fps: i
     else:
         # Default: tall and thin body shape
         # Beta[0]: height (+0.6 = taller), Beta[1]: weight (-0.5 = thinner)
-        betas = np.array([0.6, -0.5, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0], dtype=np.float64)
+        betas = np.array([0.6, -0.5, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0], dtype=np.float32)
     
     print(f"\n[convert] Converting rotation matrices to Rodrigues vectors...")
     print(f"[convert] NOTE: Applying 180° X-rotation to root for correct orientation")
@@ -207,42 +302,29 @@ def convert_to_amass_format(npz_path: str, output_path: str, gender: str, fps: i
     # - But the global orientation (root) needs 180° X-flip to match PHALP rendering
     # - PHALP applies this flip to vertices; we apply it to root rotation instead
     
-    # 180° rotation around X-axis for flipping upside-down to upright
-    R_FLIP_X_180 = np.array([
-        [1.0,  0.0,  0.0],
-        [0.0, -1.0,  0.0],
-        [0.0,  0.0, -1.0]
-    ], dtype=np.float64)
+    # Gather all 24 SMPL joints into one contiguous (T, 24, 3, 3) buffer
+    R_all = np.empty((T, 24, 3, 3), dtype=np.float64)
+    # Root (pelvis) - apply 180° X-flip to match PHALP's vertex transformation.
+    # R_FLIP_X_180 = diag(1, -1, -1), so R_FLIP_X_180 @ R just negates rows 1 and 2
+    R_all[:, 0, 0] = R_root[:, 0]
+    np.negative(R_root[:, 1:], out=R_all[:, 0, 1:])
+    # Body joints (23 joints) - keep as-is (local rotations are correct)
+    R_all[:, 1:] = R_body
     
     # Convert rotation matrices to Rodrigues vectors
-    poses = np.zeros((T, 55, 3), dtype=np.float64)
-    
-    for t in range(T):
-        # Root (pelvis) - apply 180° X-flip to match PHALP's vertex transformation
-        R_root_flipped = R_FLIP_X_180 @ R_root[t]
-        poses[t, 0] = rotmat_to_rodrigues(R_root_flipped)
-        
-        # Body joints (23 joints) - keep as-is (local rotations are correct)
-        for j in range(23):
-            poses[t, j + 1] = rotmat_to_rodrigues(R_body[t, j])
-        
-        # Remaining joints (jaw, eyes, hands) - set to zero
-        # joints 24-54 (jaw=24, eyes=25-26, hands=27-54)
-        poses[t, 24:] = 0.0
-    
-    # Flatten poses to (T, 165)
-    poses_flat = poses.reshape(T, -1)
-    
-    # Translation: already corrected by motion analysis above
-    trans_corrected = trans
+    # Written straight into the flat float32 (T, 165) AMASS buffer (55 joints * 3)
+    # Remaining joints (jaw=24, eyes=25-26, hands=27-54) stay zero
+    poses_flat = np.zeros((T, 165), dtype=np.float32)
+    poses_flat[:, :72] = rotmat_to_rodrigues(R_all).reshape(T, 72)
     
     # Create AMASS format NPZ
+    # Translation is already corrected by motion analysis above; no axis flip
     amass_data = {
-        'trans': trans_corrected.astype(np.float32),
+        'trans': trans.astype(np.float32, copy=False),
         'gender': np.array(gender),  # Can be string or bytes
         'mocap_framerate': fps,
-        'betas': betas.astype(np.float32),
-        'poses': poses_flat.astype(np.float32)
+        'betas': betas.astype(np.float32, copy=False),
+        'poses': poses_flat
     }
     
     print(f"[convert] Saving AMASS format NPZ: {output_path}")
@@ -294,13 +376,16 @@ def main_blender(args):
     temp_dir.mkdir(exist_ok=True)
     
     amass_npz = temp_dir / f"{Path(args.npz).stem}_amass.npz"
-    convert_to_amass_format(args.npz, str(amass_npz), args.gender, args.fps)
+    convert_to_amass_format(args.npz, str(amass_npz), args.gender, args.fps,
+                            verbose=not args.quiet)
+    
+    # Headless run: no undo steps for the addon's import/export operators
+    bpy.context.preferences.edit.use_global_undo = False
     
     # Clean scene
     print("\n[blender] Cleaning scene...")
-    bpy.ops.object.select_all(action='SELECT')
-    if bpy.context.selected_objects:
-        bpy.ops.object.delete()
+    # Remove datablocks directly; avoids the select + delete operator round-trip
+    bpy.data.batch_remove(list(bpy.data.objects))
     
     # Use addon's animation import
     print(f"\n[blender] Importing animation using SMPL-X addon...")
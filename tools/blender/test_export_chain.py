@@ -16,10 +16,7 @@ print("COMPLETE EXPORT CHAIN DIAGNOSTIC")
 print("="*70)
 
 # Clean scene
-for obj in list(bpy.data.objects):
-    obj.select_set(True)
-if bpy.data.objects:
-    bpy.ops.object.delete()
+bpy.data.batch_remove(list(bpy.data.objects))
 
 # Step 1: Create SMPL-X character
 print("\n[Step 1] Creating SMPL-X character...")
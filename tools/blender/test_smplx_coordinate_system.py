@@ -10,17 +10,14 @@ import math
 
 def main():
     import bpy
-    from mathutils import Matrix, Quaternion, Euler
+    from mathutils import Matrix, Quaternion, Euler, Vector
     
     print("\n" + "="*70)
     print("TESTING SMPL-X BLENDER ADDON COORDINATE SYSTEM")
     print("="*70)
     
     # Clean scene
-    for obj in list(bpy.data.objects):
-        obj.select_set(True)
-    if bpy.data.objects:
-        bpy.ops.object.delete()
+    bpy.data.batch_remove(list(bpy.data.objects))
     
     # Create SMPL-X character
     print("\n[1] Creating SMPL-X character...")
@@ -50,13 +47,17 @@ def main():
     print(f"\n[3] Test 1: Rotate pelvis 90° around X-axis")
     print(f"  Expected: Character leans backward (head moves in +Y direction)")
     
-    bpy.context.scene.frame_set(1)
-    pelvis = arm.pose.bones['pelvis']
+    # Look up the pose bones and world matrix once; reused by every test below
+    mw = arm.matrix_world
+    pose_bones = arm.pose.bones
+    pelvis = pose_bones['pelvis']
+    head_pb = pose_bones['head']
+    origin = Vector((0, 0, 0))
     pelvis.rotation_mode = 'XYZ'
     pelvis.rotation_euler = (math.radians(90), 0, 0)
     bpy.context.view_layer.update()
     
-    head_pose = arm.matrix_world @ arm.pose.bones['head'].matrix @ bpy.mathutils.Vector((0,0,0))
+    head_pose = mw @ head_pb.matrix @ origin
     print(f"  Head position: {head_pose}")
     print(f"  Change: ΔY = {head_pose.y - head_rest.y:.4f}, ΔZ = {head_pose.z - head_rest.z:.4f}")
     
@@ -64,11 +65,10 @@ def main():
     print(f"\n[4] Test 2: Rotate pelvis 90° around Y-axis")
     print(f"  Expected: Character turns left (head moves in -X direction)")
     
-    bpy.context.scene.frame_set(2)
     pelvis.rotation_euler = (0, math.radians(90), 0)
     bpy.context.view_layer.update()
     
-    head_pose = arm.matrix_world @ arm.pose.bones['head'].matrix @ bpy.mathutils.Vector((0,0,0))
+    head_pose = mw @ head_pb.matrix @ origin
     print(f"  Head position: {head_pose}")
     print(f"  Change: ΔX = {head_pose.x - head_rest.x:.4f}, ΔZ = {head_pose.z - head_rest.z:.4f}")
     
@@ -76,11 +76,10 @@ def main():
     print(f"\n[5] Test 3: Rotate pelvis 90° around Z-axis")
     print(f"  Expected: Character leans to the right (head moves in +X direction)")
     
-    bpy.context.scene.frame_set(3)
     pelvis.rotation_euler = (0, 0, math.radians(90))
     bpy.context.view_layer.update()
     
-    head_pose = arm.matrix_world @ arm.pose.bones['head'].matrix @ bpy.mathutils.Vector((0,0,0))
+    head_pose = mw @ head_pb.matrix @ origin
     print(f"  Head position: {head_pose}")
     print(f"  Change: ΔX = {head_pose.x - head_rest.x:.4f}, ΔY = {head_pose.y - head_rest.y:.4f}")
     
@@ -92,17 +91,14 @@ def main():
         [ 0.1717,  0.0490, -0.9839]
     ])
     
-    m = Matrix(((float(R_phalp[0,0]), float(R_phalp[0,1]), float(R_phalp[0,2])),
-                (float(R_phalp[1,0]), float(R_phalp[1,1]), float(R_phalp[1,2])),
-                (float(R_phalp[2,0]), float(R_phalp[2,1]), float(R_phalp[2,2]))))
+    m = Matrix(np.asarray(R_phalp, dtype=np.float64).tolist())
     q = m.to_quaternion()
     
-    bpy.context.scene.frame_set(4)
     pelvis.rotation_mode = 'QUATERNION'
     pelvis.rotation_quaternion = q
     bpy.context.view_layer.update()
     
-    head_pose = arm.matrix_world @ arm.pose.bones['head'].matrix @ bpy.mathutils.Vector((0,0,0))
+    head_pose = mw @ head_pb.matrix @ origin
     print(f"  Head position: {head_pose}")
     print(f"  Z coordinate: {head_pose.z:.4f}")
     if head_pose.z < 0:
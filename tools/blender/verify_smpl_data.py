@@ -38,10 +38,7 @@ def main():
     print("="*70)
     
     # Clean scene
-    for obj in list(bpy.data.objects):
-        obj.select_set(True)
-    if bpy.data.objects:
-        bpy.ops.object.delete()
+    bpy.data.batch_remove(list(bpy.data.objects))
     
     # Create SMPL-X character
     print("\n[1] Creating SMPL-X character...")
@@ -79,12 +76,9 @@ def main():
         print(f"    [{', '.join(f'{x:7.4f}' for x in row)}]")
     
     # Convert to quaternion
-    m = Matrix(((float(Mr[0,0]), float(Mr[0,1]), float(Mr[0,2])),
-                (float(Mr[1,0]), float(Mr[1,1]), float(Mr[1,2])),
-                (float(Mr[2,0]), float(Mr[2,1]), float(Mr[2,2]))))
+    m = Matrix(np.asarray(Mr, dtype=np.float64).tolist())
     q = m.to_quaternion()
     
-    bpy.context.scene.frame_set(1)
     if 'pelvis' in arm.pose.bones:
         pb = arm.pose.bones['pelvis']
         pb.rotation_mode = 'QUATERNION'
@@ -24,6 +24,14 @@ from typing import Any, Dict, List, Tuple
 import numpy as np
 
 
+# Per-person auxiliary arrays for motion analysis: (frame key, fallback shape)
+PERSON_FIELDS: Tuple[Tuple[str, Tuple[int, ...]], ...] = (
+    ("3d_joints", (45, 3)),
+    ("bbox", (4,)),
+    ("center", (2,)),
+)
+
+
 def safe_load_pkl(pkl_path: str) -> Dict[str, Any]:
     try:
         import joblib  # preferred
@@ -84,6 +92,7 @@ def extract_track(data: Dict[str, Any], target_tid: int) -> Dict[str, np.ndarray
     scale_list: List[float] = []
     img_size_list: List[np.ndarray] = []
 
+    tid = int(target_tid)
     for k in frame_keys:
         fr = data[k]
         if not isinstance(fr, dict):
@@ -93,10 +102,10 @@ def extract_track(data: Dict[str, Any], target_tid: int) -> Dict[str, np.ndarray
             tids = [int(x) for x in tids]
         except Exception:
             continue
-        matches = [i for i, t in enumerate(tids) if t == int(target_tid)]
-        if not matches:
+        try:
+            idx = tids.index(tid)
+        except ValueError:
             continue
-        idx = matches[0]
 
         smpl_list = fr.get("smpl")
         if not smpl_list or idx >= len(smpl_list):
@@ -123,23 +132,14 @@ def extract_track(data: Dict[str, Any], target_tid: int) -> Dict[str, np.ndarray
         frame_idx = int(fr.get("time", len(frame_idx_list)))
         
         # Extract additional data for motion analysis
-        joints_3d_list_fr = fr.get("3d_joints")
-        if joints_3d_list_fr and idx < len(joints_3d_list_fr):
-            joints_3d = np.array(joints_3d_list_fr[idx], dtype=np.float32)
-        else:
-            joints_3d = np.zeros((45, 3), dtype=np.float32)
-        
-        bbox_list_fr = fr.get("bbox")
-        if bbox_list_fr and idx < len(bbox_list_fr):
-            bbox = np.array(bbox_list_fr[idx], dtype=np.float32)
-        else:
-            bbox = np.zeros(4, dtype=np.float32)
-        
-        center_list_fr = fr.get("center")
-        if center_list_fr and idx < len(center_list_fr):
-            center = np.array(center_list_fr[idx], dtype=np.float32)
-        else:
-            center = np.zeros(2, dtype=np.float32)
+        aux = []
+        for key, shape in PERSON_FIELDS:
+            values = fr.get(key)
+            if values and idx < len(values):
+                aux.append(np.array(values[idx], dtype=np.float32))
+            else:
+                aux.append(np.zeros(shape, dtype=np.float32))
+        joints_3d, bbox, center = aux
         
         scale_list_fr = fr.get("scale")
         if scale_list_fr and idx < len(scale_list_fr):
@@ -167,17 +167,27 @@ def extract_track(data: Dict[str, Any], target_tid: int) -> Dict[str, np.ndarray
     if not R_root_list:
         raise SystemExit("No valid frames extracted for the specified tid.")
 
-    order = np.argsort(np.array(frame_idx_list))
-    R_root_arr = np.stack([R_root_list[i] for i in order], axis=0)
-    R_body_arr = np.stack([R_body_list[i] for i in order], axis=0)
-    cam_arr = np.stack([cam_list[i] for i in order], axis=0)
-    frame_idx_arr = np.array([frame_idx_list[i] for i in order], dtype=np.int32)
-    betas_arr = np.stack([betas_list[i] for i in order], axis=0)
-    joints_3d_arr = np.stack([joints_3d_list[i] for i in order], axis=0)
-    bbox_arr = np.stack([bbox_list[i] for i in order], axis=0)
-    center_arr = np.stack([center_list[i] for i in order], axis=0)
-    scale_arr = np.array([scale_list[i] for i in order], dtype=np.float32)
-    img_size_arr = np.stack([img_size_list[i] for i in order], axis=0)
+    # Frames are visited in time order, so frame_idx is normally already
+    # monotonic; only permute when it is not
+    frame_idx_arr = np.array(frame_idx_list, dtype=np.int32)
+    order = None
+    if np.any(frame_idx_arr[1:] < frame_idx_arr[:-1]):
+        order = np.argsort(frame_idx_arr, kind="stable")
+        frame_idx_arr = frame_idx_arr[order]
+
+    def _stack(items: List[Any], dtype: Any = None) -> np.ndarray:
+        arr = np.array(items, dtype=dtype) if dtype is not None else np.stack(items, axis=0)
+        return arr if order is None else arr[order]
+
+    R_root_arr = _stack(R_root_list)
+    R_body_arr = _stack(R_body_list)
+    cam_arr = _stack(cam_list)
+    betas_arr = _stack(betas_list)
+    joints_3d_arr = _stack(joints_3d_list)
+    bbox_arr = _stack(bbox_list)
+    center_arr = _stack(center_list)
+    scale_arr = _stack(scale_list, np.float32)
+    img_size_arr = _stack(img_size_list)
 
     return {
         "R_root": R_root_arr,
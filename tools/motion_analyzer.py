@@ -382,8 +382,9 @@ def analyze_motion(npz_path: str) -> Dict[str, Any]:
     Returns:
         Motion analysis result
     """
-    data = np.load(npz_path)
-    analyzer = MotionAnalyzer(dict(data))
+    # NpzFile is a lazy mapping: only the members the analyzer reads get loaded
+    with np.load(npz_path, allow_pickle=False) as data:
+        analyzer = MotionAnalyzer(data)
     return analyzer.analyze()
 
 